@@ -280,6 +280,24 @@ CREATE TRIGGER backup_size_trigger
     BEFORE INSERT OR UPDATE ON setting_backups
     FOR EACH ROW EXECUTE FUNCTION calculate_backup_size();
 
+-- 고객사/BOM 변경 알림 함수 (MES TCP 서비스 조회 캐시 갱신용)
+CREATE OR REPLACE FUNCTION notify_lookup_changed()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('lookup_changed', TG_TABLE_NAME);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 고객사/BOM 변경 알림 트리거
+CREATE TRIGGER customers_lookup_changed
+    AFTER INSERT OR UPDATE OR DELETE ON customers
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_lookup_changed();
+
+CREATE TRIGGER boms_lookup_changed
+    AFTER INSERT OR UPDATE OR DELETE ON boms
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_lookup_changed();
+
 -- ==========================================
 -- 기본 데이터 삽입
 -- ==========================================
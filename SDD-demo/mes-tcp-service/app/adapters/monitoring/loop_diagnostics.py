@@ -0,0 +1,305 @@
+"""
+이벤트 루프 진단 어댑터
+루프 지연 측정, 느린 콜백 스택 캡처, 샘플링 프로파일, 코루틴별 시간 집계
+비활성 상태에서는 플래그 확인 외의 오버헤드가 없도록 구성
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# 샘플링 프로파일 최대 시간 (초) - 기본 executor 스레드 장기 점유 방지
+MAX_PROFILE_SECONDS = 300.0
+
+
+class LoopDiagnostics:
+    """이벤트 루프 진단 관리자"""
+
+    def __init__(
+        self,
+        lag_interval: float = 0.1,
+        slow_threshold: float = 0.1,
+        sample_interval: float = 0.005,
+        profile_dir: str = "logs",
+    ):
+        self.lag_interval = lag_interval
+        self.slow_threshold = slow_threshold
+        self.sample_interval = sample_interval
+        self.profile_dir = profile_dir
+        self.enabled = False
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._lag_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._watchdog_stop = threading.Event()
+        self._profiling = False
+        self._profile_task: Optional[asyncio.Task] = None
+        self._heartbeat = 0.0
+        self._reset_stats()
+
+    def _reset_stats(self) -> None:
+        """측정값 초기화"""
+        self.lag_stats = {'samples': 0, 'last': 0.0, 'max': 0.0, 'total': 0.0}
+        self.slow_events = 0
+        self.coroutine_stats: Dict[str, Dict[str, float]] = {}
+
+    def attach(self, loop: asyncio.AbstractEventLoop) -> None:
+        """진단 대상 이벤트 루프 연결 (루프 스레드에서 호출)"""
+        self._loop = loop
+        self._loop_thread_id = threading.get_ident()
+
+    def enable(self) -> None:
+        """진단 활성화"""
+        if self.enabled or not self._loop:
+            return
+
+        self._reset_stats()
+        self.enabled = True
+        self._heartbeat = time.monotonic()
+        self._lag_task = self._loop.create_task(self._measure_lag())
+
+        # 스레드마다 새 중지 이벤트 사용 - 빠른 off/on 시 이전 스레드가 중지 신호를 놓치지 않도록
+        self._watchdog_stop = threading.Event()
+        self._watchdog = threading.Thread(
+            target=self._watch_slow_callbacks,
+            args=(self._watchdog_stop,),
+            name="loop-watchdog",
+            daemon=True,
+        )
+        self._watchdog.start()
+        logger.info("이벤트 루프 진단 활성화")
+
+    def disable(self) -> None:
+        """진단 비활성화"""
+        if not self.enabled:
+            return
+
+        self.enabled = False
+        if self._lag_task:
+            self._lag_task.cancel()
+            self._lag_task = None
+        self._watchdog_stop.set()
+        self._watchdog = None
+        logger.info(f"이벤트 루프 진단 비활성화: {self.get_stats()}")
+
+    def toggle(self) -> None:
+        """진단 활성/비활성 전환"""
+        if self.enabled:
+            self.disable()
+        else:
+            self.enable()
+
+    async def _measure_lag(self) -> None:
+        """루프 지연 측정 - 예정된 깨어남 시각과 실제 시각의 차이"""
+        while self.enabled:
+            expected = time.monotonic() + self.lag_interval
+            await asyncio.sleep(self.lag_interval)
+            now = time.monotonic()
+            lag = max(now - expected, 0.0)
+
+            self._heartbeat = now
+            self.lag_stats['samples'] += 1
+            self.lag_stats['last'] = lag
+            self.lag_stats['total'] += lag
+            self.lag_stats['max'] = max(self.lag_stats['max'], lag)
+
+    def _watch_slow_callbacks(self, stop: threading.Event) -> None:
+        """루프가 응답하지 않으면 현재 실행 중인 스택 캡처 (별도 스레드)"""
+        reported_heartbeat = 0.0
+        while not stop.wait(self.slow_threshold / 2):
+            heartbeat = self._heartbeat
+            blocked = time.monotonic() - heartbeat - self.lag_interval
+            if blocked < self.slow_threshold or heartbeat == reported_heartbeat:
+                continue
+
+            # 같은 블로킹 구간은 한 번만 보고
+            reported_heartbeat = heartbeat
+            self.slow_events += 1
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else "N/A"
+            logger.warning(
+                f"이벤트 루프 블로킹 감지: {blocked * 1000:.1f}ms 이상\n{stack}"
+            )
+
+    def start_profile(self, duration: float) -> Optional[asyncio.Task]:
+        """백그라운드 샘플링 프로파일 시작 (시그널 핸들러용) - 실행 중이면 무시"""
+        if self._profiling or (self._profile_task and not self._profile_task.done()):
+            logger.warning("프로파일링이 이미 실행 중입니다 - 요청 무시")
+            return None
+
+        self._profile_task = asyncio.create_task(self.profile(duration))
+        self._profile_task.add_done_callback(self._log_profile_result)
+        return self._profile_task
+
+    @staticmethod
+    def _log_profile_result(task: asyncio.Task) -> None:
+        """백그라운드 프로파일 실패 로깅"""
+        if not task.cancelled() and task.exception():
+            logger.error(f"샘플링 프로파일 실패: {task.exception()}")
+
+    async def profile(self, duration: float) -> str:
+        """지정 시간(최대 MAX_PROFILE_SECONDS) 동안 루프 스레드 스택을 샘플링하여 파일로 저장"""
+        if not 0 < duration <= MAX_PROFILE_SECONDS:
+            raise ValueError(f"프로파일 시간은 0초 초과 {MAX_PROFILE_SECONDS:.0f}초 이하여야 합니다")
+        if self._profiling:
+            raise RuntimeError("프로파일링이 이미 실행 중입니다")
+        if not self._loop_thread_id:
+            raise RuntimeError("이벤트 루프가 연결되지 않았습니다")
+
+        self._profiling = True
+        try:
+            samples = await asyncio.to_thread(self._sample_stacks, duration)
+        finally:
+            self._profiling = False
+
+        os.makedirs(self.profile_dir, exist_ok=True)
+        path = os.path.join(
+            self.profile_dir,
+            f"loop-profile-{datetime.now().strftime('%Y%m%d-%H%M%S')}.folded",
+        )
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+        logger.info(f"샘플링 프로파일 저장 완료: {path} ({sum(samples.values())} samples)")
+        return path
+
+    def _sample_stacks(self, duration: float) -> Counter:
+        """루프 스레드 스택 샘플 수집 (flamegraph folded 형식)"""
+        samples: Counter = Counter()
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = []
+            while frame:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                samples[";".join(reversed(stack))] += 1
+            time.sleep(self.sample_interval)
+        return samples
+
+    def record(self, name: str, elapsed: float) -> None:
+        """코루틴 실행 시간 집계"""
+        stats = self.coroutine_stats.setdefault(
+            name, {'calls': 0, 'total': 0.0, 'max': 0.0}
+        )
+        stats['calls'] += 1
+        stats['total'] += elapsed
+        stats['max'] = max(stats['max'], elapsed)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """진단 통계 조회 (단위: ms)"""
+        samples = max(self.lag_stats['samples'], 1)
+        return {
+            'enabled': self.enabled,
+            'loop_lag_ms': {
+                'last': round(self.lag_stats['last'] * 1000, 2),
+                'avg': round(self.lag_stats['total'] / samples * 1000, 2),
+                'max': round(self.lag_stats['max'] * 1000, 2),
+            },
+            'slow_events': self.slow_events,
+            'coroutines_ms': {
+                name: {
+                    'calls': int(stats['calls']),
+                    'avg': round(stats['total'] / max(stats['calls'], 1) * 1000, 2),
+                    'max': round(stats['max'] * 1000, 2),
+                    'total': round(stats['total'] * 1000, 2),
+                }
+                for name, stats in self.coroutine_stats.items()
+            },
+        }
+
+
+# 전역 진단 인스턴스
+diagnostics = LoopDiagnostics()
+
+
+def timed(name: str) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """코루틴 실행 시간 집계 데코레이터 - 진단 비활성 시 그대로 실행"""
+
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            if not diagnostics.enabled:
+                return await func(*args, **kwargs)
+
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                diagnostics.record(name, time.perf_counter() - started)
+
+        return wrapper
+
+    return decorator
+
+
+class DiagnosticsAdminServer:
+    """로컬 진단 관리 포트 (127.0.0.1 전용, 한 줄 명령)
+
+    명령: on | off | toggle | stats | profile <초>
+    """
+
+    def __init__(self, port: int, host: str = "127.0.0.1"):
+        self.host = host
+        self.port = port
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        """관리 포트 시작"""
+        self.server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        logger.info(f"진단 관리 포트 시작: {self.host}:{self.port}")
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def stop(self) -> None:
+        """관리 포트 중지"""
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+    async def _handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """관리 명령 처리"""
+        try:
+            line = (await reader.readline()).decode().strip()
+            response = await self._execute(line)
+        except Exception as e:
+            response = f"error: {e}"
+
+        writer.write(f"{response}\n".encode())
+        await writer.drain()
+        writer.close()
+
+    async def _execute(self, line: str) -> str:
+        """명령 실행"""
+        command, _, argument = line.partition(" ")
+        if command == "on":
+            diagnostics.enable()
+        elif command == "off":
+            diagnostics.disable()
+        elif command == "toggle":
+            diagnostics.toggle()
+        elif command == "profile":
+            return await diagnostics.profile(float(argument or 10))
+        elif command != "stats":
+            return f"unknown command: {command}"
+        return str(diagnostics.get_stats())
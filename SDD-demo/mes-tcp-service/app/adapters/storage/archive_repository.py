@@ -0,0 +1,202 @@
+"""
+TC 데이터 콜드 아카이브 어댑터
+오래된 tc_* 데이터를 일자/타입별 Parquet(zstd) 파일로 로컬 디스크에 보관하고
+메모리 맵 + 컬럼 선택 방식으로 기간 조회
+"""
+
+import asyncio
+import fcntl
+import logging
+import os
+import tempfile
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # 선택 의존성 (pip install -e .[archive])
+    pa = None
+    pc = None
+    pq = None
+
+from app.domain.model import TCType
+
+
+logger = logging.getLogger(__name__)
+
+
+class ArchiveRepository:
+    """Parquet 기반 TC 데이터 아카이브 저장소
+
+    디렉터리 구조: {base_dir}/{tc_type}/{YYYY-MM-DD}.parquet
+    무중단 재시작 중에는 기존/신규 프로세스가 같은 일자를 동시에 이관할 수 있으므로
+    저장은 타입 디렉터리 잠금(.lock) 안에서 고유 임시 파일로 수행
+    """
+
+    def __init__(self, base_dir: str, compression: str = "zstd"):
+        if pa is None:
+            raise RuntimeError("아카이브 기능에는 pyarrow가 필요합니다 (pip install -e .[archive])")
+
+        self.base_dir = base_dir
+        self.compression = compression
+        # 일자 목록 캐시 - 조회마다 디렉터리를 읽지 않도록 시작 시 한 번 스캔 후 저장 시 갱신
+        self._days: Dict[TCType, List[date]] = {
+            tc_type: self._scan_days(tc_type) for tc_type in TCType
+        }
+
+    @staticmethod
+    def is_available() -> bool:
+        """pyarrow 설치 여부"""
+        return pa is not None
+
+    def _partition_dir(self, tc_type: TCType) -> str:
+        return os.path.join(self.base_dir, tc_type.value)
+
+    def _partition_path(self, tc_type: TCType, day: date) -> str:
+        return os.path.join(self._partition_dir(tc_type), f"{day.isoformat()}.parquet")
+
+    def list_days(self, tc_type: TCType) -> List[date]:
+        """아카이브된 일자 목록 (오름차순)"""
+        return list(self._days.get(tc_type, []))
+
+    def _scan_days(self, tc_type: TCType) -> List[date]:
+        """디렉터리에서 아카이브 일자 목록 조회"""
+        directory = self._partition_dir(tc_type)
+        if not os.path.isdir(directory):
+            return []
+
+        days = []
+        for name in os.listdir(directory):
+            if name.endswith(".parquet"):
+                try:
+                    days.append(date.fromisoformat(name[: -len(".parquet")]))
+                except ValueError:
+                    continue
+        return sorted(days)
+
+    def archived_until(self, tc_type: TCType) -> Optional[datetime]:
+        """아카이브에 포함된 마지막 일자의 다음 날 0시 (이 시각 이전은 아카이브 조회 대상)"""
+        days = self.list_days(tc_type)
+        if not days:
+            return None
+        return datetime.combine(days[-1] + timedelta(days=1), datetime.min.time())
+
+    async def read_latest(
+        self,
+        tc_type: TCType,
+        columns: Optional[List[str]] = None,
+        filters: Optional[List[tuple]] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """아카이브 전체 기간 최신순 조회 (최신 일자부터 읽고 limit 도달 시 중단)"""
+        days = self.list_days(tc_type)
+        if not days:
+            return []
+        start = datetime.combine(days[0], datetime.min.time())
+        return await self.read_range(
+            tc_type, start, self.archived_until(tc_type), columns, filters, limit
+        )
+
+    async def write_day(self, tc_type: TCType, day: date, rows: List[Dict[str, Any]]) -> str:
+        """일자 파티션 저장 - 기존 파일이 있으면 id 기준으로 병합"""
+        return await asyncio.to_thread(self._write_day, tc_type, day, rows)
+
+    @contextmanager
+    def _locked(self, tc_type: TCType) -> Iterator[str]:
+        """타입 디렉터리 배타 잠금 (프로세스/스레드 간) - 디렉터리 경로 반환"""
+        directory = self._partition_dir(tc_type)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, ".lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield directory
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write_day(self, tc_type: TCType, day: date, rows: List[Dict[str, Any]]) -> str:
+        path = self._partition_path(tc_type, day)
+        table = pa.Table.from_pylist(rows)
+
+        with self._locked(tc_type) as directory:
+            if os.path.exists(path):
+                # 이전 이관이 삭제 전에 중단되었거나 다른 프로세스가 먼저 저장한 경우 - 중복 제거 후 병합
+                existing = pq.read_table(path, memory_map=True)
+                if "id" in table.column_names and "id" in existing.column_names:
+                    new_ids = pc.is_in(existing["id"], value_set=table["id"])
+                    existing = existing.filter(pc.invert(new_ids))
+                # 스키마는 값에서 추론되므로 (예: 전부 NULL인 컬럼은 null 타입) 병합 시 타입 승격
+                table = pa.concat_tables([existing, table], promote_options="permissive")
+
+            table = table.sort_by("created_at")
+            fd, tmp_path = tempfile.mkstemp(
+                dir=directory, prefix=f".{day.isoformat()}.", suffix=".tmp"
+            )
+            os.close(fd)
+            try:
+                pq.write_table(table, tmp_path, compression=self.compression)
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+
+        if day not in self._days[tc_type]:
+            self._days[tc_type] = sorted(self._days[tc_type] + [day])
+        return path
+
+    async def read_range(
+        self,
+        tc_type: TCType,
+        start: datetime,
+        end: datetime,
+        columns: Optional[List[str]] = None,
+        filters: Optional[List[tuple]] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """기간 조회 (start 이상, end 미만, created_at 내림차순)"""
+        return await asyncio.to_thread(
+            self._read_range, tc_type, start, end, columns, filters, limit
+        )
+
+    def _read_range(
+        self,
+        tc_type: TCType,
+        start: datetime,
+        end: datetime,
+        columns: Optional[List[str]],
+        filters: Optional[List[tuple]],
+        limit: Optional[int],
+    ) -> List[Dict[str, Any]]:
+        row_filters = [("created_at", ">=", start), ("created_at", "<", end)] + (filters or [])
+
+        results: List[Dict[str, Any]] = []
+        # 최신 일자부터 읽어 limit에 도달하면 중단
+        for day in reversed(self.list_days(tc_type)):
+            if not start.date() <= day <= end.date():
+                continue
+
+            path = self._partition_path(tc_type, day)
+            read_columns = None
+            if columns:
+                # 정렬(created_at)과 DB 데이터 중복 제거(id)에 필요한 컬럼은 항상 포함
+                names = pq.read_schema(path, memory_map=True).names
+                read_columns = list(dict.fromkeys(
+                    [c for c in columns if c in names]
+                    + [c for c in ("created_at", "id") if c in names]
+                ))
+
+            table = pq.read_table(
+                path,
+                columns=read_columns,
+                filters=row_filters,
+                memory_map=True,
+            )
+            rows = table.sort_by([("created_at", "descending")]).to_pylist()
+            results.extend(rows)
+            if limit and len(results) >= limit:
+                return results[:limit]
+
+        return results
@@ -6,16 +6,34 @@ PostgreSQL 데이터베이스 어댑터
 import asyncio
 import logging
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 import asyncpg
 from asyncpg import Pool
 
+from app.adapters.monitoring.loop_diagnostics import timed
 from app.domain.model import TCData, TCType
 from app.ports.output_port import StoragePort
 
 
 logger = logging.getLogger(__name__)
 
+# TC 타입별 테이블
+TC_TABLES = {
+    TCType.TC_4000: "tc_4000_schedule",
+    TCType.TC_4001: "tc_4001_cut",
+    TCType.TC_4002: "tc_4002_wpd",
+    TCType.TC_4003: "tc_4003_speed",
+}
+
+# 스케줄 UPSERT - 조회되지 않은 고객사/BOM(NULL)은 기존 값 유지
+SCHEDULE_UPSERT_QUERY = """
+    INSERT INTO schedules (coil_id, customer_id, bom_id)
+    VALUES ($1, $2, $3)
+    ON CONFLICT (coil_id) DO UPDATE SET
+        customer_id = COALESCE(EXCLUDED.customer_id, schedules.customer_id),
+        bom_id = COALESCE(EXCLUDED.bom_id, schedules.bom_id)
+"""
+
 
 class PostgreSQLRepository(StoragePort):
     """PostgreSQL 데이터베이스 리포지토리"""
@@ -23,6 +41,7 @@ class PostgreSQLRepository(StoragePort):
     def __init__(self, connection_string: str):
         self.connection_string = connection_string
         self.pool: Optional[Pool] = None
+        self.listener_conn: Optional[asyncpg.Connection] = None
         
     async def connect(self) -> None:
         """데이터베이스 연결 풀 생성"""
@@ -41,9 +60,13 @@ class PostgreSQLRepository(StoragePort):
     async def disconnect(self) -> None:
         """데이터베이스 연결 풀 해제"""
         if self.pool:
+            if self.listener_conn:
+                await self.pool.release(self.listener_conn)
+                self.listener_conn = None
             await self.pool.close()
             logger.info("PostgreSQL 연결 풀 해제 완료")
     
+    @timed("save_tc_data")
     async def save_tc_data(self, tc_data: TCData) -> bool:
         """TC 데이터 저장"""
         if not self.pool:
@@ -179,6 +202,72 @@ class PostgreSQLRepository(StoragePort):
         
         await conn.execute(query, *values)
     
+    async def get_customer_ids(self) -> Dict[str, int]:
+        """고객사명 -> customers.id 매핑 조회 (동명 고객사는 먼저 등록된 ID 사용)"""
+        if not self.pool:
+            return {}
+        
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(
+                "SELECT name, id FROM customers WHERE is_active ORDER BY id DESC"
+            )
+            return {row['name']: row['id'] for row in rows}
+    
+    async def get_bom_ids(self) -> Dict[str, int]:
+        """BOM 코드 -> boms.id 매핑 조회"""
+        if not self.pool:
+            return {}
+        
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch("SELECT bom_id, id FROM boms WHERE is_active")
+            return {row['bom_id']: row['id'] for row in rows}
+    
+    async def upsert_schedules(self, rows: List[tuple]) -> int:
+        """스케줄 일괄 반영 - (coil_id, customer_id, bom_id) 목록, coil_id 기준 UPSERT"""
+        if not self.pool:
+            logger.error("데이터베이스 연결이 없습니다")
+            return 0
+        
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.executemany(SCHEDULE_UPSERT_QUERY, rows)
+        
+        return len(rows)
+    
+    async def upsert_schedules_each(self, rows: List[tuple]) -> Tuple[int, List[tuple]]:
+        """스케줄 행 단위 반영 - 행마다 savepoint로 처리하여 (반영 건수, DB가 거부한 행) 반환
+        
+        연결 오류 등 행과 무관한 오류는 호출자에게 전파
+        """
+        if not self.pool:
+            logger.error("데이터베이스 연결이 없습니다")
+            return 0, []
+        
+        synced = 0
+        rejected: List[tuple] = []
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                for row in rows:
+                    try:
+                        async with conn.transaction():
+                            await conn.execute(SCHEDULE_UPSERT_QUERY, *row)
+                        synced += 1
+                    except asyncpg.PostgresError as e:
+                        logger.warning(f"스케줄 반영 거부: {row[0]} - {e}")
+                        rejected.append(row)
+        
+        return synced, rejected
+    
+    async def listen(self, channel: str, callback) -> None:
+        """NOTIFY 채널 구독 (전용 연결 유지)"""
+        if not self.pool:
+            return
+        
+        if not self.listener_conn:
+            self.listener_conn = await self.pool.acquire()
+        await self.listener_conn.add_listener(channel, callback)
+        logger.info(f"PostgreSQL NOTIFY 구독: {channel}")
+    
     async def get_tc_data_by_type(self, tc_type: TCType, limit: int = 100) -> List[Dict[str, Any]]:
         """TC 타입별 데이터 조회"""
         if not self.pool:
@@ -186,15 +275,8 @@ class PostgreSQLRepository(StoragePort):
         
         try:
             async with self.pool.acquire() as conn:
-                if tc_type == TCType.TC_4000:
-                    table_name = "tc_4000_schedule"
-                elif tc_type == TCType.TC_4001:
-                    table_name = "tc_4001_cut"
-                elif tc_type == TCType.TC_4002:
-                    table_name = "tc_4002_wpd"
-                elif tc_type == TCType.TC_4003:
-                    table_name = "tc_4003_speed"
-                else:
+                table_name = TC_TABLES.get(tc_type)
+                if not table_name:
                     return []
                 
                 query = f"""
@@ -210,6 +292,46 @@ class PostgreSQLRepository(StoragePort):
             logger.error(f"TC 데이터 조회 실패: {e}")
             return []
     
+    async def get_tc_data_between(
+        self, tc_type: TCType, start: datetime, end: datetime, limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """TC 타입별 기간 데이터 조회 (start 이상, end 미만)"""
+        table_name = TC_TABLES.get(tc_type)
+        if not self.pool or not table_name:
+            return []
+        
+        query = f"""
+            SELECT * FROM {table_name}
+            WHERE created_at >= $1 AND created_at < $2
+            ORDER BY created_at DESC
+            LIMIT $3
+        """
+        
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(query, start, end, limit)
+            return [dict(row) for row in rows]
+    
+    async def delete_tc_data_between(self, tc_type: TCType, start: datetime, end: datetime) -> int:
+        """TC 타입별 기간 데이터 삭제 (아카이브 이관 후)"""
+        table_name = TC_TABLES.get(tc_type)
+        if not self.pool or not table_name:
+            return 0
+        
+        query = f"DELETE FROM {table_name} WHERE created_at >= $1 AND created_at < $2"
+        
+        async with self.pool.acquire() as conn:
+            result = await conn.execute(query, start, end)
+            return int(result.split()[-1])
+    
+    async def get_oldest_created_at(self, tc_type: TCType) -> Optional[datetime]:
+        """TC 타입별 가장 오래된 데이터 시각"""
+        table_name = TC_TABLES.get(tc_type)
+        if not self.pool or not table_name:
+            return None
+        
+        async with self.pool.acquire() as conn:
+            return await conn.fetchval(f"SELECT MIN(created_at) FROM {table_name}")
+    
     async def get_latest_tc_data_by_coil(self, coil_number: str) -> Dict[str, Any]:
         """코일번호별 최신 TC 데이터 조회"""
         if not self.pool:
@@ -0,0 +1,317 @@
+"""
+고기원 전송 ACK 윈도우 어댑터
+포트별 전송 대기열과 송신 태스크로 전문을 전달하고,
+ACK 추적 활성 시 sequence_no 기준으로 ACK 대조, 미수신 시 재전송하며
+ACK 지연에 따라 윈도우 크기 조절
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class InFlightFrame:
+    """ACK 대기 중인 전문"""
+    raw_data: str
+    first_sent_at: float
+    sent_at: float
+    retries: int = 0
+    retransmit: bool = True
+
+
+class AckWindow:
+    """포트별 슬라이딩 전송 윈도우
+
+    - submit()은 대기열에 넣고 바로 반환 (수신/저장 경로를 막지 않음), 대기열 초과 시 폐기
+    - 송신 태스크(run)가 대기열 전문을 윈도우 범위 내에서 전송
+    - ACK 추적 비활성 시 윈도우/재전송 없이 순서대로 전송만 수행
+    - ACK 지연이 최소 지연에 가까우면 윈도우 확대, 지연이 커지면 축소, 타임아웃 시 절반으로 축소
+    - 연속 unresponsive_after건 폐기되면 무응답으로 판단해 재전송과 윈도우 대기를 중단하고
+      ACK 지연만 관찰 (모니터링 모드), ACK가 다시 들어오면 복귀
+    """
+
+    def __init__(
+        self,
+        port: int,
+        send_func: Callable[[str, int], Awaitable[Any]],
+        ack_tracking: bool = False,
+        initial_window: int = 8,
+        min_window: int = 1,
+        max_window: int = 64,
+        min_rto: float = 0.2,
+        max_rto: float = 5.0,
+        max_retries: int = 3,
+        max_queue: int = 10000,
+        unresponsive_after: int = 3,
+    ):
+        self.port = port
+        self.send_func = send_func
+        self.ack_tracking = ack_tracking
+        self.initial_window = initial_window
+        self.window = float(initial_window)
+        self.min_window = min_window
+        self.max_window = max_window
+        self.min_rto = min_rto
+        self.max_rto = max_rto
+        self.max_retries = max_retries
+        self.max_queue = max_queue
+        self.unresponsive_after = unresponsive_after
+        self.running = False
+        self.degraded = False
+
+        self.queue: Deque[Tuple[str, str]] = deque()
+        self.in_flight: "OrderedDict[str, InFlightFrame]" = OrderedDict()
+        self._state = asyncio.Condition()
+        self._queued = asyncio.Event()
+        self._stop_event = asyncio.Event()
+        self._consecutive_drops = 0
+        self.sending = 0  # 대기열/ACK 대기에서 꺼내 send_func 실행 중인 전문 수
+
+        # ACK 지연 추정 (초)
+        self.srtt: Optional[float] = None
+        self.rttvar = 0.0
+        self.min_rtt: Optional[float] = None
+        self.max_rtt = 0.0
+
+        self.stats = {
+            'sent': 0, 'acked': 0, 'retransmitted': 0, 'dropped': 0,
+            'unacked': 0, 'overflow': 0, 'send_errors': 0, 'unknown_acks': 0
+        }
+
+    @property
+    def rto(self) -> float:
+        """재전송 타임아웃"""
+        if self.srtt is None:
+            return self.max_rto
+        return min(max(self.srtt + 4 * self.rttvar, self.min_rto), self.max_rto)
+
+    def _tracked(self, sequence_no: str) -> bool:
+        return self.ack_tracking and bool(sequence_no)
+
+    def submit(self, sequence_no: str, raw_data: str) -> bool:
+        """전송 대기열에 추가 (대기하지 않음) - 대기열 초과 시 False"""
+        if len(self.queue) >= self.max_queue:
+            self.stats['overflow'] += 1
+            logger.warning(f"고기원 전송 대기열 초과로 전문 폐기: 포트 {self.port} - {sequence_no}")
+            return False
+
+        self.queue.append((sequence_no, raw_data))
+        self._queued.set()
+        return True
+
+    def _notify(self) -> None:
+        """상태 변경 알림 (락 없이 호출 가능)"""
+        async def notify() -> None:
+            async with self._state:
+                self._state.notify_all()
+        asyncio.get_running_loop().create_task(notify())
+
+    def _has_slot(self) -> bool:
+        return self.degraded or len(self.in_flight) < int(self.window)
+
+    async def run(self) -> None:
+        """송신 태스크 (ACK 추적 시 재전송 태스크 포함)"""
+        self.running = True
+        self._stop_event.clear()
+        tasks = [self._send_loop()]
+        if self.ack_tracking:
+            tasks.append(self._retransmit_loop())
+        await asyncio.gather(*tasks)
+
+    async def _send_loop(self) -> None:
+        """대기열 전문을 윈도우 범위 내에서 전송"""
+        while self.running:
+            if not self.queue:
+                self._queued.clear()
+                await self._queued.wait()
+                continue
+
+            async with self._state:
+                sequence_no, raw_data = self.queue[0]
+                if self._tracked(sequence_no):
+                    await self._state.wait_for(lambda: self._has_slot() or not self.running)
+                    if not self.running:
+                        return
+                    if sequence_no in self.in_flight:
+                        logger.warning(f"고기원 전송 sequence 중복: 포트 {self.port} - {sequence_no}")
+                    now = time.monotonic()
+                    # 모니터링 모드에서는 ACK 지연만 관찰하고 재전송하지 않음
+                    self.in_flight[sequence_no] = InFlightFrame(
+                        raw_data, now, now, retransmit=not self.degraded
+                    )
+                self.queue.popleft()
+                self.sending += 1
+                self._state.notify_all()
+
+            try:
+                await self.send_func(raw_data, self.port)
+                self.stats['sent'] += 1
+            except Exception as e:
+                # 추적 중인 전문은 재전송 대상으로 남음
+                self.stats['send_errors'] += 1
+                logger.error(f"고기원 전송 실패: 포트 {self.port} - {e}")
+            finally:
+                await self._sent()
+
+    async def _sent(self) -> None:
+        """전송 1건 완료 - 드레인 대기자에게 알림"""
+        async with self._state:
+            self.sending -= 1
+            self._state.notify_all()
+
+    async def ack(self, sequence_no: str) -> Optional[float]:
+        """ACK 수신 처리 - 전송부터 ACK까지 지연(초) 반환"""
+        async with self._state:
+            frame = self.in_flight.pop(sequence_no, None)
+            if not frame:
+                self.stats['unknown_acks'] += 1
+                return None
+
+            latency = time.monotonic() - frame.first_sent_at
+            self.stats['acked'] += 1
+            self._consecutive_drops = 0
+            if self.degraded:
+                self.degraded = False
+                self.window = float(self.initial_window)
+                logger.info(f"고기원 ACK 수신 재개 - 재전송 재개: 포트 {self.port}")
+            # 재전송된 전문은 어느 전송에 대한 ACK인지 알 수 없으므로 지연 추정에서 제외
+            if frame.retries == 0:
+                self._update_rtt(latency)
+            self._state.notify_all()
+            return latency
+
+    def _update_rtt(self, rtt: float) -> None:
+        """ACK 지연 갱신 및 윈도우 크기 조절"""
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+            self.srtt = 0.875 * self.srtt + 0.125 * rtt
+        self.min_rtt = rtt if self.min_rtt is None else min(self.min_rtt, rtt)
+        self.max_rtt = max(self.max_rtt, rtt)
+
+        # 지연이 최소 지연 대비 작으면 확대, 대기열이 쌓여 지연이 늘면 축소
+        if rtt <= 1.5 * self.min_rtt:
+            self.window = min(self.window + 1 / self.window, self.max_window)
+        elif rtt > 2 * self.min_rtt:
+            self.window = max(self.window - 1 / self.window, self.min_window)
+
+    async def _retransmit_loop(self) -> None:
+        """ACK 타임아웃 전문 재전송"""
+        while self.running:
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), self.min_rto / 2)
+                break
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self._retransmit_expired()
+            except Exception as e:
+                logger.error(f"고기원 재전송 처리 오류: 포트 {self.port} - {e}")
+
+    async def _retransmit_expired(self) -> None:
+        """타임아웃된 전문 재전송, 최대 재시도 초과 시 폐기"""
+        now = time.monotonic()
+        rto = self.rto
+        expired = []
+        dropped = 0
+
+        async with self._state:
+            for sequence_no, frame in list(self.in_flight.items()):
+                if now - frame.sent_at < rto * (2 ** frame.retries):
+                    continue
+
+                if not frame.retransmit:
+                    del self.in_flight[sequence_no]
+                    self.stats['unacked'] += 1
+                elif frame.retries >= self.max_retries:
+                    del self.in_flight[sequence_no]
+                    dropped += 1
+                    self.stats['dropped'] += 1
+                    logger.error(f"고기원 ACK 미수신으로 전문 폐기: 포트 {self.port} - {sequence_no}")
+                else:
+                    frame.retries += 1
+                    frame.sent_at = now
+                    expired.append(frame)
+
+            if expired or dropped:
+                self.window = max(self.window / 2, self.min_window)
+            self._consecutive_drops += dropped
+            if dropped and not self.degraded and self._consecutive_drops >= self.unresponsive_after:
+                self._enter_degraded()
+            self.sending += len(expired)
+            self._state.notify_all()
+
+        for frame in expired:
+            try:
+                await self.send_func(frame.raw_data, self.port)
+                self.stats['retransmitted'] += 1
+            except Exception as e:
+                self.stats['send_errors'] += 1
+                logger.error(f"고기원 재전송 실패: 포트 {self.port} - {e}")
+            finally:
+                await self._sent()
+
+    def _enter_degraded(self) -> None:
+        """ACK 무응답 - 재전송과 윈도우 대기 중단 (락 보유 상태에서 호출)"""
+        self.degraded = True
+        for frame in self.in_flight.values():
+            frame.retransmit = False
+        logger.warning(
+            f"고기원 ACK 연속 {self._consecutive_drops}건 미수신 - "
+            f"재전송 중단, ACK 모니터링 모드: 포트 {self.port}"
+        )
+
+    async def drain(self, timeout: float, wait_for_acks: bool = True) -> bool:
+        """대기열 전송 완료(및 ACK 대기 전문 해제)까지 대기 - 전송 중인 전문 포함"""
+        def drained() -> bool:
+            if self.queue or self.sending:
+                return False
+            return not (wait_for_acks and self.ack_tracking and not self.degraded
+                        and any(frame.retransmit for frame in self.in_flight.values()))
+
+        if drained():
+            return True
+        try:
+            async with self._state:
+                await asyncio.wait_for(self._state.wait_for(drained), timeout)
+            return True
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"고기원 전송 드레인 시간 초과: 포트 {self.port} - "
+                f"대기열 {len(self.queue)}건, 전송 중 {self.sending}건, ACK 대기 {len(self.in_flight)}건"
+            )
+            return False
+
+    def stop(self) -> None:
+        """송신/재전송 중지"""
+        self.running = False
+        self._stop_event.set()
+        self._queued.set()
+        self._notify()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """윈도우 상태 및 ACK 지연 (단위: ms)"""
+        return {
+            **self.stats,
+            'ack_tracking': self.ack_tracking,
+            'degraded': self.degraded,
+            'queued': len(self.queue),
+            'sending': self.sending,
+            'in_flight': len(self.in_flight),
+            'window': int(self.window),
+            'latency_ms': {
+                'avg': round(self.srtt * 1000, 2) if self.srtt is not None else None,
+                'min': round(self.min_rtt * 1000, 2) if self.min_rtt is not None else None,
+                'max': round(self.max_rtt * 1000, 2),
+                'rto': round(self.rto * 1000, 2),
+            },
+        }
@@ -0,0 +1,230 @@
+"""
+리스닝 소켓 인계 어댑터
+무중단 재시작을 위해 기존 프로세스의 리스닝 소켓(9304, 9306)을
+Unix 도메인 소켓(SCM_RIGHTS)으로 새 프로세스에 전달
+
+인계는 2단계로 진행 - 새 프로세스가 소켓을 받은 뒤 수신기 시작까지 마치고
+READY를 보내야 기존 프로세스가 드레인/종료를 시작하며, 그 전에 새 프로세스가
+실패하면 (연결 종료) 기존 프로세스는 계속 서비스
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import struct
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+HANDOFF_REQUEST = b"HANDOFF"
+HANDOFF_READY = b"READY"
+MAX_HANDOFF_FDS = 8
+DEFAULT_HANDOFF_PATH = "/run/ineiji-tcp-service/handoff.sock"
+
+
+def _peer_uid(conn: socket.socket) -> int:
+    """Unix 소켓 상대 프로세스의 uid (SO_PEERCRED)"""
+    creds = conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    _, uid, _ = struct.unpack("3i", creds)
+    return uid
+
+
+class ListenerHandoff:
+    """리스닝 소켓 인계 관리자"""
+
+    def __init__(self, path: str, timeout: float = 5.0, ready_timeout: float = 60.0):
+        self.path = path
+        self.timeout = timeout
+        self.ready_timeout = ready_timeout  # 새 프로세스의 수신 시작(READY) 대기 시간
+        self.sockets: Dict[str, socket.socket] = {}
+        self._listener: Optional[socket.socket] = None
+        self._handoff_conn: Optional[socket.socket] = None  # READY 전송 전까지 유지
+
+    async def acquire(self, bindings: Dict[str, Tuple[str, int]]) -> Dict[str, socket.socket]:
+        """기존 프로세스로부터 소켓 인계, 없으면 새로 바인딩"""
+        # 인계 요청은 최대 timeout초 블로킹되므로 별도 스레드에서 실행
+        inherited = await asyncio.to_thread(self._request_handoff)
+
+        for name, (host, port) in bindings.items():
+            sock = inherited.pop(name, None)
+            if sock:
+                sock.setblocking(False)
+                logger.info(f"리스닝 소켓 인계 완료: {name} - 포트 {port}")
+            else:
+                sock = self._create_listening_socket(host, port)
+                logger.info(f"리스닝 소켓 생성: {name} - 포트 {port}")
+            self.sockets[name] = sock
+
+        # 더 이상 사용하지 않는 인계 소켓 정리
+        for sock in inherited.values():
+            sock.close()
+
+        return self.sockets
+
+    def _request_handoff(self) -> Dict[str, socket.socket]:
+        """실행 중인 기존 프로세스에 소켓 인계 요청 - 성공 시 confirm()까지 연결 유지"""
+        if not os.path.exists(self.path):
+            return {}
+
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            conn.settimeout(self.timeout)
+            conn.connect(self.path)
+            # 같은 사용자로 실행 중인 프로세스에게서만 소켓을 받음
+            peer_uid = _peer_uid(conn)
+            if peer_uid != os.getuid():
+                logger.error(f"인계 소켓 소유자 불일치: uid={peer_uid} - 인계 거부")
+                conn.close()
+                return {}
+            conn.sendall(HANDOFF_REQUEST)
+            payload, fds, _, _ = socket.recv_fds(conn, 4096, MAX_HANDOFF_FDS)
+        except (ConnectionRefusedError, FileNotFoundError):
+            # 이전 프로세스가 남긴 경로만 존재하는 경우
+            conn.close()
+            return {}
+        except Exception as e:
+            logger.error(f"리스닝 소켓 인계 요청 실패: {e}")
+            conn.close()
+            return {}
+
+        names = json.loads(payload.decode()) if payload else []
+        if len(names) != len(fds):
+            logger.error(f"인계 소켓 수 불일치: names={names}, fds={len(fds)}")
+            for fd in fds:
+                os.close(fd)
+            conn.close()
+            return {}
+
+        self._handoff_conn = conn
+        return {name: socket.socket(fileno=fd) for name, fd in zip(names, fds)}
+
+    async def confirm(self) -> None:
+        """수신기 시작 완료를 기존 프로세스에 알림 (READY) - 이후 기존 프로세스가 드레인 후 종료"""
+        conn, self._handoff_conn = self._handoff_conn, None
+        if not conn:
+            return
+
+        try:
+            await asyncio.to_thread(conn.sendall, HANDOFF_READY)
+            logger.info("기존 프로세스에 수신 시작 알림 완료")
+        except OSError as e:
+            logger.error(f"기존 프로세스 수신 시작 알림 실패: {e}")
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _create_listening_socket(host: str, port: int) -> socket.socket:
+        """TCP 리스닝 소켓 생성"""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((host, port))
+        sock.listen(socket.SOMAXCONN)
+        sock.setblocking(False)
+        return sock
+
+    async def serve(self, on_handoff: Callable[[], Awaitable[None]]) -> None:
+        """인계 요청 대기 - 요청 시 소켓 전달 후 on_handoff 호출"""
+        try:
+            self._listener = self._create_handoff_listener()
+        except OSError as e:
+            logger.error(f"소켓 인계 대기 시작 실패 - 무중단 재시작 비활성: {self.path} - {e}")
+            self._listener = None
+            return
+        logger.info(f"소켓 인계 대기 시작: {self.path}")
+
+        loop = asyncio.get_running_loop()
+        while self._listener:
+            try:
+                conn, _ = await loop.sock_accept(self._listener)
+            except (asyncio.CancelledError, OSError):
+                break
+
+            with conn:
+                try:
+                    peer_uid = _peer_uid(conn)
+                    if peer_uid != os.getuid():
+                        logger.warning(f"다른 사용자의 인계 요청 거부: uid={peer_uid}")
+                        continue
+
+                    request = await asyncio.wait_for(
+                        loop.sock_recv(conn, len(HANDOFF_REQUEST)), self.timeout
+                    )
+                    if request != HANDOFF_REQUEST:
+                        logger.warning(f"알 수 없는 인계 요청: {request!r}")
+                        continue
+
+                    names = list(self.sockets.keys())
+                    fds = [sock.fileno() for sock in self.sockets.values()]
+                    conn.setblocking(True)
+                    socket.send_fds(conn, [json.dumps(names).encode()], fds)
+                    conn.setblocking(False)
+                    logger.info(f"리스닝 소켓 전달 완료, 새 프로세스 수신 시작 대기: {names}")
+
+                    # 새 프로세스가 수신기를 시작할 때까지 계속 서비스
+                    if not await self._wait_ready(conn):
+                        continue
+                except Exception as e:
+                    logger.error(f"리스닝 소켓 인계 실패: {e}")
+                    continue
+
+            # 인계 후에는 경로를 새 프로세스에 넘기고 더 이상 요청을 받지 않음
+            logger.info("새 프로세스 수신 시작 확인 - 인계 완료")
+            self._close_listener(unlink=False)
+            await on_handoff()
+            break
+
+    async def _wait_ready(self, conn: socket.socket) -> bool:
+        """새 프로세스의 수신 시작 알림(READY) 대기 - 실패 시 인계 취소"""
+        try:
+            ready = await asyncio.wait_for(
+                asyncio.get_running_loop().sock_recv(conn, len(HANDOFF_READY)),
+                self.ready_timeout
+            )
+        except asyncio.TimeoutError:
+            logger.error("새 프로세스 수신 시작 대기 시간 초과 - 인계 취소, 서비스 계속")
+            return False
+
+        if ready != HANDOFF_READY:
+            logger.error("새 프로세스가 수신 시작 전에 종료됨 - 인계 취소, 서비스 계속")
+            return False
+        return True
+
+    def _create_handoff_listener(self) -> socket.socket:
+        """인계 요청 소켓 생성 (소유자 전용 디렉터리, 0600 권한)"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            listener.bind(self.path)
+            os.chmod(self.path, 0o600)
+            listener.listen(1)
+            listener.setblocking(False)
+        except OSError:
+            listener.close()
+            raise
+        return listener
+
+    def _close_listener(self, unlink: bool) -> None:
+        """인계 요청 소켓 정리"""
+        if self._listener:
+            self._listener.close()
+            self._listener = None
+            if unlink and os.path.exists(self.path):
+                os.unlink(self.path)
+
+    def close(self) -> None:
+        """인계 요청 소켓 정리 (일반 종료 시 경로 삭제)
+
+        READY 전송 전에 호출되면 (시작 실패) 연결만 끊어 기존 프로세스가 계속 서비스
+        """
+        if self._handoff_conn:
+            self._handoff_conn.close()
+            self._handoff_conn = None
+        self._close_listener(unlink=True)
@@ -2,13 +2,19 @@
 기존 UseCase에 PostgreSQL 연동 기능 추가
 """
 
+import asyncio
 import logging
-from typing import Dict, Any, Optional
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
 from app.domain.model import TCData, TCType
 from app.domain.service import DataParsingService
 from app.ports.input_port import DataReceiverPort
 from app.ports.output_port import StoragePort, DataSenderPort
-from app.adapters.storage.postgresql_repository import PostgreSQLRepository
+from app.adapters.storage.archive_repository import ArchiveRepository
+from app.adapters.storage.postgresql_repository import PostgreSQLRepository, TC_TABLES
+from app.adapters.monitoring.loop_diagnostics import timed
+from app.adapters.tcp.ack_window import AckWindow
 
 
 logger = logging.getLogger(__name__)
@@ -17,25 +23,71 @@ logger = logging.getLogger(__name__)
 class DataProcessingUseCase:
     """데이터 처리 유스케이스 - PostgreSQL 연동 포함"""
     
+    # 고기원 서버별 포트 매핑
+    GOGI_PORTS = {
+        TCType.TC_4000: 9308,  # 스케줄
+        TCType.TC_4002: 9309,  # WPD pass
+        TCType.TC_4003: 9310,  # Line Speed
+    }
+    
     def __init__(
         self, 
         storage: StoragePort,
         postgresql_storage: PostgreSQLRepository,
         data_sender: DataSenderPort,
-        parsing_service: DataParsingService
+        parsing_service: DataParsingService,
+        schedule_sync: Optional['ScheduleSyncUseCase'] = None,
+        gogi_ack_tracking: bool = False,
+        data_query: Optional['DataQueryUseCase'] = None
     ):
         self.storage = storage  # 기존 메모리 저장소
         self.postgresql_storage = postgresql_storage  # PostgreSQL 저장소
         self.data_sender = data_sender
         self.parsing_service = parsing_service
+        self.schedule_sync = schedule_sync  # schedules 테이블 동기화
+        self.data_query = data_query  # 아카이브 포함 조회 (선택)
         self.stats = {
             'total_received': 0,
             'total_saved': 0,
             'postgresql_saved': 0,
             'errors': 0
         }
+        # 고기원 포트별 전송 대기열 및 ACK 윈도우
+        # ACK 전문 형식 확정 전까지 ACK 추적/재전송은 기본 비활성
+        self.gogi_ack_tracking = gogi_ack_tracking
+        self.gogi_windows = {
+            port: AckWindow(port, self.data_sender.send_data, ack_tracking=gogi_ack_tracking)
+            for port in self.GOGI_PORTS.values()
+        }
+        # 처리 중인 데이터 수 (무중단 재시작 시 드레인 용도)
+        self.in_flight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
     
+    @timed("process_received_data")
     async def process_received_data(self, raw_data: str, source: str) -> bool:
+        """수신된 데이터 처리 - 처리 중 건수 추적"""
+        self.in_flight += 1
+        self._idle.clear()
+        try:
+            return await self._process_received_data(raw_data, source)
+        finally:
+            self.in_flight -= 1
+            if self.in_flight == 0:
+                self._idle.set()
+    
+    async def wait_until_idle(self, timeout: float) -> bool:
+        """처리 중인 데이터가 모두 끝날 때까지 대기"""
+        if self.in_flight == 0:
+            return True
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            logger.warning(f"드레인 시간 초과: 처리 중 {self.in_flight}건")
+            return False
+    
+    async def _process_received_data(self, raw_data: str, source: str) -> bool:
         """수신된 데이터 처리 - PostgreSQL 저장 포함"""
         try:
             self.stats['total_received'] += 1
@@ -61,8 +113,12 @@ class DataProcessingUseCase:
             else:
                 logger.error(f"PostgreSQL 저장 실패: {tc_data.tc_type.value}")
             
-            # 4. 고기원으로 데이터 전달 (기존 로직 유지)
-            if tc_data.tc_type in [TCType.TC_4000, TCType.TC_4002, TCType.TC_4003]:
+            # 3-1. 스케줄은 schedules 테이블에도 반영 (배치 처리)
+            if tc_data.tc_type == TCType.TC_4000 and self.schedule_sync:
+                self.schedule_sync.enqueue(tc_data)
+            
+            # 4. 고기원으로 데이터 전달
+            if tc_data.tc_type in self.GOGI_PORTS:
                 await self._forward_to_gogi(tc_data)
             
             return memory_saved and postgresql_saved
@@ -72,30 +128,75 @@ class DataProcessingUseCase:
             self.stats['errors'] += 1
             return False
     
+    @timed("_forward_to_gogi")
     async def _forward_to_gogi(self, tc_data: TCData) -> None:
-        """고기원으로 데이터 전달 (기존 로직)"""
+        """고기원으로 데이터 전달 - 포트별 전송 대기열에 넣고 바로 반환 (송신 태스크가 전송)"""
         try:
-            # 고기원 서버별 포트 매핑
-            port_mapping = {
-                TCType.TC_4000: 9308,  # 스케줄
-                TCType.TC_4002: 9309,  # WPD pass
-                TCType.TC_4003: 9310,  # Line Speed
-            }
+            target_port = self.GOGI_PORTS.get(tc_data.tc_type)
+            if not target_port:
+                return
             
-            target_port = port_mapping.get(tc_data.tc_type)
-            if target_port:
-                await self.data_sender.send_data(tc_data.raw_data, target_port)
-                logger.debug(f"고기원 전달 완료: {tc_data.tc_type.value} -> 포트 {target_port}")
+            # sequence_no가 없으면 ACK 대조가 불가하므로 추적 없이 전송
+            sequence_no = str(tc_data.data.get('sequence_no', '')).strip()
+            if self.gogi_windows[target_port].submit(sequence_no, tc_data.raw_data):
+                logger.debug(f"고기원 전송 대기열 추가: {tc_data.tc_type.value} -> 포트 {target_port}")
             
         except Exception as e:
             logger.error(f"고기원 데이터 전달 실패: {e}")
     
+    async def handle_gogi_ack(self, raw_data: str) -> bool:
+        """고기원 ACK 처리 - TC 타입과 sequence_no로 전송 전문 해제
+        
+        무중단 재시작 중에는 기존 프로세스가 보낸 전문의 ACK가 새 프로세스로
+        들어올 수 있으며, 이 경우 대기 중이 아닌 ACK로 집계만 하고 무시
+        """
+        if not self.gogi_ack_tracking:
+            logger.debug(f"고기원 ACK 수신: {raw_data}")
+            return False
+        
+        ack = self.parsing_service.parse_tc_data(raw_data)
+        if not ack:
+            logger.warning(f"고기원 ACK 파싱 실패: {raw_data[:100]}...")
+            return False
+        
+        target_port = self.GOGI_PORTS.get(ack.tc_type)
+        sequence_no = str(ack.data.get('sequence_no', '')).strip()
+        if not target_port or not sequence_no:
+            logger.warning(f"고기원 ACK 대조 불가: {ack.tc_type.value} - {sequence_no}")
+            return False
+        
+        latency = await self.gogi_windows[target_port].ack(sequence_no)
+        if latency is None:
+            logger.debug(f"대기 중이 아닌 고기원 ACK: 포트 {target_port} - {sequence_no}")
+            return False
+        
+        logger.debug(f"고기원 ACK 수신: 포트 {target_port} - {sequence_no} ({latency * 1000:.1f}ms)")
+        return True
+    
+    async def run_gogi_windows(self) -> None:
+        """고기원 포트별 송신/재전송 태스크 실행"""
+        await asyncio.gather(*(window.run() for window in self.gogi_windows.values()))
+    
+    async def drain_gogi_windows(self, timeout: float, wait_for_acks: bool = True) -> bool:
+        """전송 대기열(및 ACK 대기 전문) 드레인 후 송신 중지"""
+        results = await asyncio.gather(
+            *(window.drain(timeout, wait_for_acks) for window in self.gogi_windows.values())
+        )
+        for window in self.gogi_windows.values():
+            window.stop()
+        return all(results)
+    
     async def get_processing_stats(self) -> Dict[str, Any]:
         """처리 통계 조회"""
         db_stats = await self.postgresql_storage.get_connection_stats()
         
         return {
             **self.stats,
+            'in_flight': self.in_flight,
+            'schedule_sync': self.schedule_sync.stats if self.schedule_sync else None,
+            'gogi_windows': {
+                port: window.get_stats() for port, window in self.gogi_windows.items()
+            },
             'postgresql_connection': db_stats,
             'success_rate': (
                 self.stats['postgresql_saved'] / max(self.stats['total_received'], 1) * 100
@@ -105,6 +206,8 @@ class DataProcessingUseCase:
     async def get_coil_data(self, coil_number: str) -> Dict[str, Any]:
         """코일번호별 데이터 조회"""
         try:
+            if self.data_query:
+                return await self.data_query.get_latest_tc_data_by_coil(coil_number)
             return await self.postgresql_storage.get_latest_tc_data_by_coil(coil_number)
         except Exception as e:
             logger.error(f"코일 데이터 조회 실패: {e}")
@@ -119,6 +222,188 @@ class DataProcessingUseCase:
         }
 
 
+class ScheduleSyncUseCase:
+    """TC 4000 스케줄 -> schedules 테이블 배치 동기화 유스케이스
+    
+    customer_name, ccl_bom은 메모리 캐시로 customers.id, boms.id에 매핑하며
+    캐시는 lookup_changed NOTIFY 수신 시 갱신
+    
+    배치가 실패하면 행 단위로 다시 반영하고, DB가 거부한 행은 max_attempts회
+    실패 후 폐기하여 한 행 때문에 이후 동기화가 멈추지 않도록 함
+    """
+    
+    LOOKUP_CHANNEL = 'lookup_changed'
+    
+    def __init__(
+        self,
+        postgresql_storage: PostgreSQLRepository,
+        batch_size: int = 200,
+        flush_interval: float = 1.0,
+        cache_ttl: float = 300.0,
+        max_attempts: int = 3
+    ):
+        self.postgresql_storage = postgresql_storage
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.cache_ttl = cache_ttl
+        self.max_attempts = max_attempts
+        self.running = False
+        
+        # 코일번호 -> (customer_name, ccl_bom), 같은 코일은 최신 값만 유지
+        self.pending: Dict[str, Tuple[str, str]] = {}
+        # 코일번호 -> DB가 거부한 횟수
+        self.attempts: Dict[str, int] = {}
+        self.customer_ids: Dict[str, int] = {}
+        self.bom_ids: Dict[str, int] = {}
+        self.cache_stale = True
+        self.cache_refreshed_at = 0.0
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self.stats = {
+            'synced': 0,
+            'batches': 0,
+            'unresolved_customers': 0,
+            'unresolved_boms': 0,
+            'rejected': 0,
+            'dropped': 0,
+            'errors': 0
+        }
+    
+    async def initialize(self) -> None:
+        """조회 캐시 로드 및 변경 알림 구독 - 실패해도 서비스 시작은 계속 (flush에서 재시도)"""
+        try:
+            await self.postgresql_storage.listen(self.LOOKUP_CHANNEL, self._on_lookup_changed)
+        except Exception as e:
+            logger.error(f"조회 캐시 변경 알림 구독 실패 - cache_ttl 주기로만 갱신: {e}")
+        
+        try:
+            await self._refresh_caches()
+        except Exception as e:
+            logger.error(f"조회 캐시 로드 실패 - 다음 배치에서 재시도: {e}")
+            self.cache_stale = True
+    
+    def _on_lookup_changed(self, connection, pid, channel, payload) -> None:
+        """customers/boms 변경 알림 - 다음 배치에서 캐시 갱신"""
+        logger.debug(f"조회 캐시 무효화: {payload}")
+        self.cache_stale = True
+    
+    async def _refresh_caches(self) -> None:
+        """고객사/BOM 조회 캐시 갱신"""
+        self.customer_ids = await self.postgresql_storage.get_customer_ids()
+        self.bom_ids = await self.postgresql_storage.get_bom_ids()
+        self.cache_stale = False
+        self.cache_refreshed_at = time.monotonic()
+        logger.info(
+            f"조회 캐시 갱신: customers={len(self.customer_ids)}, boms={len(self.bom_ids)}"
+        )
+    
+    def enqueue(self, tc_data: TCData) -> None:
+        """스케줄 동기화 대기열에 추가"""
+        data = tc_data.data
+        coil_number = data.get('coil_number', '').strip()
+        if not coil_number:
+            return
+        
+        self.pending[coil_number] = (
+            data.get('customer_name', '').strip(),
+            data.get('ccl_bom', '').strip()
+        )
+        if len(self.pending) >= self.batch_size:
+            self._wakeup.set()
+    
+    async def run(self) -> None:
+        """배치 크기 도달 또는 flush_interval마다 반영"""
+        self.running = True
+        while self.running:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+    
+    async def flush(self) -> int:
+        """대기 중인 스케줄을 한 번에 UPSERT - 실패 시 행 단위로 재시도"""
+        async with self._flush_lock:
+            if not self.pending:
+                return 0
+            
+            batch, self.pending = self.pending, {}
+            try:
+                cache_expired = time.monotonic() - self.cache_refreshed_at > self.cache_ttl
+                if self.cache_stale or cache_expired:
+                    await self._refresh_caches()
+                
+                rows = [
+                    (coil_number, self._resolve_customer(customer_name), self._resolve_bom(ccl_bom))
+                    for coil_number, (customer_name, ccl_bom) in batch.items()
+                ]
+                try:
+                    synced = await self.postgresql_storage.upsert_schedules(rows)
+                    rejected: List[tuple] = []
+                except Exception as e:
+                    logger.warning(f"스케줄 일괄 동기화 실패 - 행 단위 재시도: {e}")
+                    synced, rejected = await self.postgresql_storage.upsert_schedules_each(rows)
+                
+            except Exception as e:
+                # 연결 오류 등 행과 무관한 실패 - 배치 전체를 다음 주기에 재시도
+                # (그 사이 들어온 최신 값 우선)
+                logger.error(f"스케줄 동기화 실패: {e}")
+                self.stats['errors'] += 1
+                self._requeue(batch)
+                return 0
+            
+            rejected_coils = {row[0] for row in rejected}
+            for coil_number in batch:
+                if coil_number not in rejected_coils:
+                    self.attempts.pop(coil_number, None)
+            self._retry_rejected(batch, rejected_coils)
+            
+            self.stats['synced'] += synced
+            self.stats['batches'] += 1
+            logger.debug(f"스케줄 동기화 완료: {synced}건")
+            return synced
+    
+    def _requeue(self, batch: Dict[str, Tuple[str, str]]) -> None:
+        """실패한 배치를 대기열에 복귀 (그 사이 들어온 최신 값 우선)"""
+        for coil_number, values in batch.items():
+            self.pending.setdefault(coil_number, values)
+    
+    def _retry_rejected(self, batch: Dict[str, Tuple[str, str]], rejected_coils: set) -> None:
+        """DB가 거부한 행은 max_attempts회까지 재시도 후 폐기"""
+        for coil_number in rejected_coils:
+            attempts = self.attempts.get(coil_number, 0) + 1
+            self.stats['rejected'] += 1
+            if attempts >= self.max_attempts:
+                self.attempts.pop(coil_number, None)
+                self.stats['dropped'] += 1
+                logger.error(f"스케줄 동기화 {attempts}회 실패로 폐기: {coil_number}")
+                continue
+            
+            self.attempts[coil_number] = attempts
+            self.pending.setdefault(coil_number, batch[coil_number])
+    
+    def _resolve_customer(self, customer_name: str) -> Optional[int]:
+        """고객사명 -> customers.id"""
+        customer_id = self.customer_ids.get(customer_name)
+        if customer_name and customer_id is None:
+            self.stats['unresolved_customers'] += 1
+        return customer_id
+    
+    def _resolve_bom(self, ccl_bom: str) -> Optional[int]:
+        """BOM 코드 -> boms.id"""
+        bom_id = self.bom_ids.get(ccl_bom)
+        if ccl_bom and bom_id is None:
+            self.stats['unresolved_boms'] += 1
+        return bom_id
+    
+    async def stop(self) -> None:
+        """동기화 중지 - 남은 대기열 반영"""
+        self.running = False
+        self._wakeup.set()
+        await self.flush()
+
+
 class ConnectionManagementUseCase:
     """연결 관리 유스케이스"""
     
@@ -144,24 +429,191 @@ class ConnectionManagementUseCase:
             logger.error(f"연결 정리 실패: {e}")
 
 
+class ArchiveUseCase:
+    """오래된 TC 데이터 콜드 아카이브 이관 유스케이스
+    
+    보관 기간(retention_days)이 지난 일자를 tc_* 테이블에서 Parquet 파일로 옮기고
+    파일 저장이 끝난 일자만 DB에서 삭제
+    """
+    
+    def __init__(
+        self,
+        postgresql_storage: PostgreSQLRepository,
+        archive_storage: ArchiveRepository,
+        retention_days: int = 90,
+        interval: float = 6 * 3600
+    ):
+        self.postgresql_storage = postgresql_storage
+        self.archive_storage = archive_storage
+        self.retention_days = retention_days
+        self.interval = interval
+        self.running = False
+        self._stop_event = asyncio.Event()
+        self.stats = {'archived_rows': 0, 'archived_days': 0, 'errors': 0}
+    
+    async def archive_closed_days(self) -> Dict[str, int]:
+        """보관 기간이 지난 일자 이관 - TC 타입별 이관 건수 반환"""
+        cutoff = datetime.combine(
+            date.today() - timedelta(days=self.retention_days), datetime.min.time()
+        )
+        archived: Dict[str, int] = {}
+        
+        for tc_type in TC_TABLES:
+            try:
+                archived[tc_type.value] = await self._archive_tc_type(tc_type, cutoff)
+            except Exception as e:
+                # 한 타입의 실패가 다른 타입 이관을 막지 않도록 타입별로 처리
+                logger.error(f"아카이브 이관 실패: {tc_type.value} - {e}")
+                self.stats['errors'] += 1
+        
+        return archived
+    
+    async def _archive_tc_type(self, tc_type: TCType, cutoff: datetime) -> int:
+        """TC 타입 하나의 보관 기간 경과 일자 이관 - 이관 건수 반환"""
+        oldest = await self.postgresql_storage.get_oldest_created_at(tc_type)
+        if not oldest:
+            return 0
+        
+        total = 0
+        day_start = datetime.combine(oldest.date(), datetime.min.time())
+        while day_start < cutoff and not self._stop_event.is_set():
+            day_end = day_start + timedelta(days=1)
+            rows = await self.postgresql_storage.get_tc_data_between(
+                tc_type, day_start, day_end
+            )
+            if rows:
+                path = await self.archive_storage.write_day(tc_type, day_start.date(), rows)
+                deleted = await self.postgresql_storage.delete_tc_data_between(
+                    tc_type, day_start, day_end
+                )
+                total += deleted
+                self.stats['archived_rows'] += deleted
+                self.stats['archived_days'] += 1
+                logger.info(f"아카이브 이관 완료: {tc_type.value} {day_start.date()} - {deleted}건 -> {path}")
+            day_start = day_end
+        
+        return total
+    
+    async def run(self) -> None:
+        """주기적 아카이브 이관"""
+        self.running = True
+        while self.running:
+            try:
+                await self.archive_closed_days()
+            except Exception as e:
+                logger.error(f"아카이브 이관 실패: {e}")
+                self.stats['errors'] += 1
+            
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+    
+    def stop(self) -> None:
+        """아카이브 이관 중지 (진행 중인 일자 처리 후 종료)"""
+        self.running = False
+        self._stop_event.set()
+
+
 class DataQueryUseCase:
-    """데이터 조회 유스케이스"""
+    """데이터 조회 유스케이스
     
-    def __init__(self, postgresql_storage: PostgreSQLRepository):
+    콜드 아카이브 사용 시 tc_* 테이블에서 이관된 데이터는 아카이브에서 이어서 조회
+    """
+    
+    # get_latest_tc_data_by_coil 결과 키별 TC 타입 (코일번호 컬럼이 있는 타입)
+    COIL_TC_TYPES = {
+        'schedule': TCType.TC_4000,
+        'cut': TCType.TC_4001,
+        'wpd': TCType.TC_4002,
+    }
+    
+    def __init__(
+        self,
+        postgresql_storage: PostgreSQLRepository,
+        archive_storage: Optional[ArchiveRepository] = None
+    ):
         self.postgresql_storage = postgresql_storage
+        self.archive_storage = archive_storage  # 콜드 아카이브 (선택)
+    
+    async def get_tc_data_range(
+        self,
+        tc_type: TCType,
+        start: datetime,
+        end: datetime,
+        columns: Optional[List[str]] = None,
+        limit: Optional[int] = None
+    ) -> list:
+        """기간별 TC 데이터 조회 - DB에 없는 오래된 구간은 아카이브에서 조회"""
+        try:
+            rows = await self.postgresql_storage.get_tc_data_between(tc_type, start, end, limit)
+            
+            archived_until = (
+                self.archive_storage.archived_until(tc_type) if self.archive_storage else None
+            )
+            if archived_until and start < archived_until and (not limit or len(rows) < limit):
+                archived = await self.archive_storage.read_range(
+                    tc_type,
+                    start,
+                    min(end, archived_until),
+                    columns=columns,
+                    limit=limit - len(rows) if limit else None
+                )
+                # 이관 중 DB 삭제 전 상태의 중복 제외
+                hot_ids = {row['id'] for row in rows if 'id' in row}
+                rows.extend(row for row in archived if row.get('id') not in hot_ids)
+                rows.sort(key=lambda row: row['created_at'], reverse=True)
+            
+            if columns:
+                rows = [{key: row.get(key) for key in columns} for row in rows]
+            return rows
+            
+        except Exception as e:
+            logger.error(f"기간별 TC 데이터 조회 실패: {e}")
+            return []
     
     async def get_recent_tc_data(self, tc_type: TCType, limit: int = 100) -> list:
-        """최근 TC 데이터 조회"""
+        """최근 TC 데이터 조회 - DB 데이터가 limit보다 적으면 아카이브에서 이어서 조회"""
         try:
-            return await self.postgresql_storage.get_tc_data_by_type(tc_type, limit)
+            rows = await self.postgresql_storage.get_tc_data_by_type(tc_type, limit)
+            if self.archive_storage and len(rows) < limit:
+                rows.extend(
+                    await self.archive_storage.read_latest(tc_type, limit=limit - len(rows))
+                )
+            return rows
         except Exception as e:
             logger.error(f"TC 데이터 조회 실패: {e}")
             return []
     
+    async def get_latest_tc_data_by_coil(self, coil_number: str) -> Dict[str, Any]:
+        """코일번호별 최신 TC 데이터 조회 - DB에 없는 항목은 아카이브에서 조회"""
+        data = await self.postgresql_storage.get_latest_tc_data_by_coil(coil_number)
+        if not self.archive_storage:
+            return data
+        
+        # 아카이브는 항상 DB보다 오래된 구간이므로 DB에 없는 항목만 조회
+        for key, tc_type in self.COIL_TC_TYPES.items():
+            if key not in data:
+                rows = await self.archive_storage.read_latest(
+                    tc_type, filters=[('coil_number', '==', coil_number)], limit=1
+                )
+                if rows:
+                    data[key] = rows[0]
+        
+        # DB의 속도 조회는 DB에 있는 스케줄 기준이므로, 스케줄이 이관된 경우 기간 조회로 보완
+        if 'schedule' in data and 'speeds' not in data:
+            speeds = await self.get_tc_data_range(
+                TCType.TC_4003, data['schedule']['created_at'], datetime.now(), limit=10
+            )
+            if speeds:
+                data['speeds'] = speeds
+        
+        return data
+    
     async def get_coil_summary(self, coil_number: str) -> Dict[str, Any]:
         """코일 요약 정보 조회"""
         try:
-            data = await self.postgresql_storage.get_latest_tc_data_by_coil(coil_number)
+            data = await self.get_latest_tc_data_by_coil(coil_number)
             
             summary = {
                 'coil_number': coil_number,
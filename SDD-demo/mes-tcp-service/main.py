@@ -3,18 +3,24 @@
 """
 
 import asyncio
+import inspect
 import logging
 import os
 import signal
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from app.application.use_case import (
     DataProcessingUseCase, 
     ConnectionManagementUseCase,
-    DataQueryUseCase
+    DataQueryUseCase,
+    ScheduleSyncUseCase,
+    ArchiveUseCase
 )
+from app.adapters.storage.archive_repository import ArchiveRepository
 from app.adapters.storage.memory_repository import MemoryRepository
 from app.adapters.storage.postgresql_repository import PostgreSQLRepository
+from app.adapters.monitoring.loop_diagnostics import DiagnosticsAdminServer, diagnostics
+from app.adapters.tcp.listener_handoff import DEFAULT_HANDOFF_PATH, ListenerHandoff
 from app.adapters.tcp.tcp_receiver import TCPReceiver
 from app.adapters.tcp.tcp_sender import TCPSender
 from app.domain.service import DataParsingService
@@ -35,6 +41,7 @@ class IneijiTCPService:
     def __init__(self):
         self.settings = get_settings()
         self.running = False
+        self.stop_task: Optional[asyncio.Task] = None
         
         # 저장소 초기화
         self.memory_storage = MemoryRepository()
@@ -47,24 +54,68 @@ class IneijiTCPService:
         self.tcp_sender = TCPSender()
         
         # UseCase 초기화
+        self.schedule_sync_use_case = ScheduleSyncUseCase(
+            postgresql_storage=self.postgresql_storage
+        )
+        
+        # 콜드 아카이브 (INEIJI_ARCHIVE_DIR 설정 시에만 활성)
+        # 이관된 데이터는 tc_* 테이블에서 삭제됨 - 이 서비스의 조회(DataQueryUseCase,
+        # 코일 데이터 조회)는 아카이브까지 이어서 조회하지만, HMI(Next.js) 이력/대시보드
+        # API는 tc_*를 직접 조회하므로 보관 기간 이전 데이터는 해당 화면에 표시되지 않음
+        self.archive_storage = None
+        self.archive_use_case = None
+        self.archive_task: Optional[asyncio.Task] = None
+        archive_dir = os.getenv('INEIJI_ARCHIVE_DIR')
+        if archive_dir and not ArchiveRepository.is_available():
+            logger.warning("INEIJI_ARCHIVE_DIR 설정됨, pyarrow 미설치 - 콜드 아카이브 비활성")
+        elif archive_dir:
+            self.archive_storage = ArchiveRepository(base_dir=archive_dir)
+            self.archive_use_case = ArchiveUseCase(
+                postgresql_storage=self.postgresql_storage,
+                archive_storage=self.archive_storage,
+                retention_days=int(os.getenv('INEIJI_ARCHIVE_RETENTION_DAYS', '90'))
+            )
+        
+        self.data_query_use_case = DataQueryUseCase(
+            postgresql_storage=self.postgresql_storage,
+            archive_storage=self.archive_storage
+        )
+        
         self.data_processing_use_case = DataProcessingUseCase(
             storage=self.memory_storage,
             postgresql_storage=self.postgresql_storage,
             data_sender=self.tcp_sender,
-            parsing_service=self.parsing_service
+            parsing_service=self.parsing_service,
+            schedule_sync=self.schedule_sync_use_case,
+            gogi_ack_tracking=os.getenv('INEIJI_GOGI_ACK_TRACKING', 'false').lower() in ('1', 'true', 'yes'),
+            data_query=self.data_query_use_case
         )
         
         self.connection_management_use_case = ConnectionManagementUseCase(
             postgresql_storage=self.postgresql_storage
         )
         
-        self.data_query_use_case = DataQueryUseCase(
-            postgresql_storage=self.postgresql_storage
-        )
-        
         # TCP 수신기들
         self.tcp_receivers = {}
         
+        # 무중단 재시작 (리스닝 소켓 인계 및 드레인)
+        self.listener_handoff = ListenerHandoff(
+            path=os.getenv('INEIJI_HANDOFF_PATH', DEFAULT_HANDOFF_PATH)
+        )
+        self.drain_timeout = float(os.getenv('INEIJI_DRAIN_TIMEOUT', '30'))
+        self.handoff_task: Optional[asyncio.Task] = None
+        self.gogi_task: Optional[asyncio.Task] = None
+        self.handed_off = False
+        self.handoff_enabled = 'sock' in inspect.signature(TCPReceiver).parameters
+        
+        # 이벤트 루프 진단 관리 포트 (0이면 비활성, 시그널로만 제어)
+        diag_port = int(os.getenv('INEIJI_DIAG_PORT', '0'))
+        diagnostics.profile_dir = os.getenv(
+            'INEIJI_DIAG_PROFILE_DIR',
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs')
+        )
+        self.diagnostics_server = DiagnosticsAdminServer(port=diag_port) if diag_port else None
+        
     def _get_postgresql_connection_string(self) -> str:
         """PostgreSQL 연결 문자열 생성"""
         db_host = os.getenv('DB_HOST', 'localhost')
@@ -85,12 +136,15 @@ class IneijiTCPService:
                 logger.error("데이터베이스 연결 초기화 실패")
                 return False
             
-            # 2. TCP 수신기 초기화
-            await self._initialize_tcp_receivers()
+            # 2. 스케줄 동기화 조회 캐시 로드
+            await self.schedule_sync_use_case.initialize()
             
             # 3. TCP 송신기 초기화
             await self.tcp_sender.initialize()
             
+            # 4. TCP 수신기 초기화 (소켓 인계 요청 - 마지막 단계에서 수행)
+            await self._initialize_tcp_receivers()
+            
             logger.info("인이지 TCP 서비스 초기화 완료")
             return True
             
@@ -100,18 +154,33 @@ class IneijiTCPService:
     
     async def _initialize_tcp_receivers(self) -> None:
         """TCP 수신기들 초기화"""
+        # 소켓 인계는 TCPReceiver가 미리 바인딩된 소켓(sock 인자)을 받아
+        # asyncio.start_server(sock=...)에 넘길 수 있어야 동작함
+        receiver_kwargs = {'dongkook': {}, 'gogi_ack': {}}
+        if self.handoff_enabled:
+            # 실행 중인 기존 프로세스가 있으면 리스닝 소켓을 인계받음
+            sockets = await self.listener_handoff.acquire({
+                'dongkook': (self.settings.INEIJI_HOST, self.settings.INEIJI_SERVER1_PORT),
+                'gogi_ack': (self.settings.INEIJI_HOST, self.settings.INEIJI_SERVER2_PORT),
+            })
+            receiver_kwargs = {name: {'sock': sock} for name, sock in sockets.items()}
+        else:
+            logger.warning("TCPReceiver가 sock 인자를 지원하지 않음 - 무중단 재시작 비활성")
+        
         # 동국으로부터 데이터 수신 (포트 9304)
         self.tcp_receivers['dongkook'] = TCPReceiver(
             host=self.settings.INEIJI_HOST,
             port=self.settings.INEIJI_SERVER1_PORT,
-            data_handler=self._handle_dongkook_data
+            data_handler=self._handle_dongkook_data,
+            **receiver_kwargs['dongkook']
         )
         
         # 고기원으로부터 ACK 수신 (포트 9306)
         self.tcp_receivers['gogi_ack'] = TCPReceiver(
             host=self.settings.INEIJI_HOST,
             port=self.settings.INEIJI_SERVER2_PORT,
-            data_handler=self._handle_gogi_ack
+            data_handler=self._handle_gogi_ack,
+            **receiver_kwargs['gogi_ack']
         )
     
     async def _handle_dongkook_data(self, data: str, client_info: Dict[str, Any]) -> None:
@@ -131,10 +200,9 @@ class IneijiTCPService:
             logger.error(f"동국 데이터 처리 중 오류: {e}")
     
     async def _handle_gogi_ack(self, data: str, client_info: Dict[str, Any]) -> None:
-        """고기원 ACK 처리 (기존 로직 유지)"""
+        """고기원 ACK 처리 - 전송 윈도우에서 해당 전문 해제"""
         try:
-            logger.debug(f"고기원 ACK 수신: {data}")
-            # ACK 처리 로직 (필요시 구현)
+            await self.data_processing_use_case.handle_gogi_ack(data)
         except Exception as e:
             logger.error(f"고기원 ACK 처리 중 오류: {e}")
     
@@ -154,10 +222,40 @@ class IneijiTCPService:
                 tasks.append(task)
                 logger.info(f"TCP 수신기 '{name}' 시작됨 - 포트 {receiver.port}")
             
+            # 소켓을 인계받은 경우 수신기가 시작된 뒤에만 기존 프로세스에 종료를 알림
+            # (그 전에 실패하면 기존 프로세스가 계속 서비스)
+            if self.handoff_enabled:
+                if not await self._wait_for_receivers(tasks):
+                    raise RuntimeError("TCP 수신기 시작 실패")
+                await self.listener_handoff.confirm()
+            
+            # 스케줄 동기화 태스크 시작
+            tasks.append(asyncio.create_task(self.schedule_sync_use_case.run()))
+            
+            # 고기원 송신/ACK 재전송 태스크 시작
+            self.gogi_task = asyncio.create_task(self.data_processing_use_case.run_gogi_windows())
+            tasks.append(self.gogi_task)
+            
+            # 콜드 아카이브 이관 태스크 시작
+            if self.archive_use_case:
+                self.archive_task = asyncio.create_task(self.archive_use_case.run())
+                tasks.append(self.archive_task)
+            
             # 상태 모니터링 태스크 시작
             monitor_task = asyncio.create_task(self._monitor_status())
             tasks.append(monitor_task)
             
+            # 진단 관리 포트 시작
+            if self.diagnostics_server:
+                tasks.append(asyncio.create_task(self.diagnostics_server.start()))
+            
+            # 소켓 인계 요청 대기 태스크 시작
+            if self.handoff_enabled:
+                self.handoff_task = asyncio.create_task(
+                    self.listener_handoff.serve(self._on_handoff)
+                )
+                tasks.append(self.handoff_task)
+            
             # 모든 태스크 대기
             await asyncio.gather(*tasks, return_exceptions=True)
             
@@ -165,6 +263,16 @@ class IneijiTCPService:
             logger.error(f"서비스 시작 실패: {e}")
             raise
     
+    async def _wait_for_receivers(self, tasks: list, timeout: float = 10.0) -> bool:
+        """모든 TCP 수신기가 수신을 시작할 때까지 대기"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while not all(receiver.running for receiver in self.tcp_receivers.values()):
+            if any(task.done() for task in tasks) or loop.time() > deadline:
+                return False
+            await asyncio.sleep(0.05)
+        return True
+    
     async def _monitor_status(self) -> None:
         """서비스 상태 모니터링"""
         while self.running:
@@ -181,19 +289,86 @@ class IneijiTCPService:
                 if not all(health.values()):
                     logger.warning(f"헬스체크 실패: {health}")
                 
+                # 진단 활성 시 루프 통계 출력
+                if diagnostics.enabled:
+                    logger.info(f"이벤트 루프 진단: {diagnostics.get_stats()}")
+                
             except Exception as e:
                 logger.error(f"상태 모니터링 오류: {e}")
     
+    async def _on_handoff(self) -> None:
+        """리스닝 소켓 인계 후 기존 프로세스 종료"""
+        logger.info("새 프로세스에 리스닝 소켓 인계됨. 드레인 후 종료합니다...")
+        self.handed_off = True
+        # 인계 대기 태스크 내부에서 호출되므로 별도 태스크로 중지
+        asyncio.create_task(self.stop())
+    
     async def stop(self) -> None:
-        """서비스 중지"""
+        """서비스 중지 - 중복 호출 시 진행 중인 중지 작업 완료까지 대기"""
+        if self.stop_task is None:
+            self.stop_task = asyncio.create_task(self._shutdown())
+        await asyncio.shield(self.stop_task)
+    
+    async def _shutdown(self) -> None:
+        """수신 중단, 처리 중 데이터 드레인 후 연결 정리"""
         try:
             logger.info("인이지 TCP 서비스 중지 시작...")
             self.running = False
             
-            # TCP 수신기들 중지
+            # 드레인 단계 전체에 하나의 마감 시각 적용
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.drain_timeout
+            
+            # 아카이브 이관 중지 - 소켓 인계 시 새 프로세스도 이관을 시작하므로 가장 먼저 중지
+            if self.archive_use_case:
+                self.archive_use_case.stop()
+            
+            # 소켓 인계 대기 중지
+            if self.handoff_task and not self.handoff_task.done():
+                self.handoff_task.cancel()
+            self.listener_handoff.close()
+            
+            # 진단 중지
+            diagnostics.disable()
+            if self.diagnostics_server:
+                await self.diagnostics_server.stop()
+            
+            # TCP 수신기들 중지 (신규 수신 중단)
+            # 고기원 ACK 수신기는 ACK 대기 전문 드레인 이후 중지
             for name, receiver in self.tcp_receivers.items():
-                await receiver.stop()
-                logger.info(f"TCP 수신기 '{name}' 중지됨")
+                if name != 'gogi_ack':
+                    await receiver.stop()
+                    logger.info(f"TCP 수신기 '{name}' 중지됨")
+            
+            # 처리 중인 데이터 드레인 (DB 저장 및 고기원 전달 완료 대기)
+            if await self.data_processing_use_case.wait_until_idle(
+                max(deadline - loop.time(), 0)
+            ):
+                logger.info("처리 중인 데이터 드레인 완료")
+            
+            # 고기원 전송 대기열 및 ACK 대기 전문 드레인
+            # 소켓 인계 후에는 9306 리스닝 소켓을 새 프로세스도 accept하므로 기존 전문의
+            # ACK가 새 프로세스로 갈 수 있음 - 대기열 전송까지만 기다리고 ACK는 기다리지 않음
+            if await self.data_processing_use_case.drain_gogi_windows(
+                max(deadline - loop.time(), 0),
+                wait_for_acks=not self.handed_off
+            ):
+                logger.info("고기원 전송 드레인 완료")
+            
+            # 송신 태스크 종료 대기 (송신기 정리 전 전송 중인 전문 완료)
+            if self.gogi_task and not self.gogi_task.done():
+                await asyncio.wait({self.gogi_task}, timeout=max(deadline - loop.time(), 0))
+            
+            if 'gogi_ack' in self.tcp_receivers:
+                await self.tcp_receivers['gogi_ack'].stop()
+                logger.info("TCP 수신기 'gogi_ack' 중지됨")
+            
+            # 진행 중인 일자 이관 완료 대기 (DB 연결 정리 전)
+            if self.archive_task and not self.archive_task.done():
+                await asyncio.wait({self.archive_task}, timeout=max(deadline - loop.time(), 0))
+            
+            # 남은 스케줄 동기화 반영
+            await self.schedule_sync_use_case.stop()
             
             # TCP 송신기 중지
             await self.tcp_sender.cleanup()
@@ -224,6 +399,7 @@ class IneijiTCPService:
                     for name, receiver in self.tcp_receivers.items()
                 },
                 'processing_stats': stats,
+                'diagnostics': diagnostics.get_stats(),
                 'health_check': health,
                 'settings': {
                     'host': self.settings.INEIJI_HOST,
@@ -248,14 +424,21 @@ async def main():
         # 서비스 인스턴스 생성
         service_instance = IneijiTCPService()
         
-        # 시그널 핸들러 등록
-        def signal_handler(signum, frame):
+        # 시그널 핸들러 등록 (이벤트 루프에서 실행)
+        loop = asyncio.get_running_loop()
+        
+        def signal_handler(signum):
             logger.info(f"시그널 {signum} 수신됨. 서비스 종료 중...")
             if service_instance:
                 asyncio.create_task(service_instance.stop())
         
-        signal.signal(signal.SIGINT, signal_handler)
-        signal.signal(signal.SIGTERM, signal_handler)
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, signal_handler, signum)
+        
+        # 이벤트 루프 진단: SIGUSR1 활성/비활성 전환, SIGUSR2 10초 샘플링 프로파일
+        diagnostics.attach(loop)
+        loop.add_signal_handler(signal.SIGUSR1, diagnostics.toggle)
+        loop.add_signal_handler(signal.SIGUSR2, diagnostics.start_profile, 10)
         
         # 서비스 시작
         await service_instance.start()
@@ -0,0 +1,180 @@
+"""
+AckWindow 테스트
+"""
+
+import asyncio
+
+from app.adapters.tcp.ack_window import AckWindow
+
+
+class RecordingSender:
+    """전송 기록용 송신기"""
+
+    def __init__(self):
+        self.sent = []
+
+    async def send_data(self, raw_data: str, port: int) -> None:
+        self.sent.append(raw_data)
+
+
+def _window(sender: RecordingSender, **kwargs) -> AckWindow:
+    options = dict(ack_tracking=True, min_rto=0.01, max_rto=0.01, max_retries=2)
+    options.update(kwargs)
+    return AckWindow(9308, sender.send_data, **options)
+
+
+async def _run_for(window: AckWindow, seconds: float) -> None:
+    task = asyncio.create_task(window.run())
+    await asyncio.sleep(seconds)
+    window.stop()
+    await task
+
+
+def test_submit_does_not_block_when_window_full():
+    """윈도우가 가득 차도 submit은 바로 반환하고 대기열에 쌓임"""
+    async def scenario():
+        sender = RecordingSender()
+        window = _window(sender, initial_window=2, max_rto=10.0, min_rto=10.0)
+        for i in range(5):
+            assert window.submit(str(i), f"frame-{i}")
+
+        await _run_for(window, 0.05)
+        assert sender.sent == ["frame-0", "frame-1"]
+        assert len(window.queue) == 3
+
+    asyncio.run(scenario())
+
+
+def test_queue_overflow_is_counted():
+    """대기열 초과 전문은 폐기하고 집계"""
+    window = _window(RecordingSender(), max_queue=2)
+    assert window.submit("1", "a")
+    assert window.submit("2", "b")
+    assert not window.submit("3", "c")
+    assert window.stats['overflow'] == 1
+
+
+def test_untracked_sends_without_window_or_retransmit():
+    """ACK 추적 비활성 시 윈도우 없이 전송만 수행"""
+    async def scenario():
+        sender = RecordingSender()
+        window = _window(sender, ack_tracking=False, initial_window=1)
+        for i in range(5):
+            window.submit(str(i), f"frame-{i}")
+
+        await _run_for(window, 0.05)
+        assert len(sender.sent) == 5
+        assert not window.in_flight
+        assert window.stats['retransmitted'] == 0
+
+    asyncio.run(scenario())
+
+
+def test_drop_after_max_retries():
+    """ACK 미수신 전문은 max_retries 재전송 후 폐기"""
+    async def scenario():
+        sender = RecordingSender()
+        window = _window(sender, max_retries=2)
+        window.submit("1", "frame-1")
+
+        await _run_for(window, 0.3)
+        assert sender.sent == ["frame-1"] * 3
+        assert window.stats['retransmitted'] == 2
+        assert window.stats['dropped'] == 1
+        assert not window.in_flight
+
+    asyncio.run(scenario())
+
+
+def test_no_ack_collapse_switches_to_monitoring_and_recovers():
+    """ACK가 전혀 오지 않으면 재전송을 멈추고 전송을 계속하며, ACK 재개 시 복귀"""
+    async def scenario():
+        sender = RecordingSender()
+        window = _window(sender, initial_window=2, max_retries=1, unresponsive_after=2)
+        task = asyncio.create_task(window.run())
+
+        for i in range(2):
+            window.submit(str(i), f"frame-{i}")
+        await asyncio.sleep(0.2)
+        assert window.degraded
+
+        # 모니터링 모드 - 윈도우 대기/재전송 없이 전부 한 번씩 전송
+        sent_before = len(sender.sent)
+        for i in range(2, 20):
+            window.submit(str(i), f"frame-{i}")
+        await asyncio.sleep(0.05)
+        assert len(sender.sent) - sent_before == 18
+        assert window.stats['retransmitted'] == 2
+
+        window.submit("ok", "frame-ok")
+        await asyncio.sleep(0.001)
+        assert await window.ack("ok") is not None
+        assert not window.degraded
+        assert window.window >= window.initial_window
+
+        window.stop()
+        await task
+
+    asyncio.run(scenario())
+
+
+def test_window_grows_and_shrinks_with_ack_latency():
+    """ACK 지연이 최소 지연 근처면 확대, 2배를 넘으면 축소"""
+    window = _window(RecordingSender(), initial_window=4)
+
+    for _ in range(10):
+        window._update_rtt(0.010)
+    grown = window.window
+    assert grown > 4
+
+    for _ in range(10):
+        window._update_rtt(0.050)
+    assert window.window < grown
+    assert window.window >= window.min_window
+
+
+def test_drain_times_out_with_unacked_frames():
+    """ACK 대기 전문이 남아 있으면 drain 시간 초과"""
+    async def scenario():
+        window = _window(RecordingSender(), min_rto=10.0, max_rto=10.0)
+        task = asyncio.create_task(window.run())
+        window.submit("1", "frame-1")
+        await asyncio.sleep(0.01)
+
+        assert not await window.drain(0.05)
+        assert await window.drain(0.05, wait_for_acks=False)
+
+        await window.ack("1")
+        assert await window.drain(0.05)
+
+        window.stop()
+        await task
+
+    asyncio.run(scenario())
+
+
+def test_drain_waits_for_frame_being_sent():
+    """대기열이 비어도 send_func 실행 중인 전문이 끝날 때까지 드레인 대기"""
+    async def scenario():
+        sent = []
+        release = asyncio.Event()
+
+        async def slow_send(raw_data: str, port: int) -> None:
+            await release.wait()
+            sent.append(raw_data)
+
+        window = AckWindow(9308, slow_send)
+        task = asyncio.create_task(window.run())
+        window.submit("1", "frame-1")
+        await asyncio.sleep(0.01)
+        assert not window.queue
+
+        assert not await window.drain(0.05)
+        release.set()
+        assert await window.drain(0.05)
+        assert sent == ["frame-1"]
+
+        window.stop()
+        await task
+
+    asyncio.run(scenario())
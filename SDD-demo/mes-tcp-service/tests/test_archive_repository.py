@@ -0,0 +1,114 @@
+"""
+ArchiveRepository 테스트
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+import pytest
+
+pytest.importorskip("pyarrow")
+# app.domain은 이 저장소에 포함되지 않은 서비스 모듈 - 없으면 건너뜀
+pytest.importorskip("app.domain.model")
+
+from app.adapters.storage.archive_repository import ArchiveRepository
+from app.domain.model import TCType
+
+
+DAY = date(2025, 1, 1)
+DAY_START = datetime(2025, 1, 1)
+
+
+def _row(row_id: int, spare=None) -> dict:
+    return {
+        'id': row_id,
+        'line_code': 'CCL1',
+        'spare': spare,
+        'line_speed': row_id * 10,
+        'created_at': DAY_START + timedelta(minutes=row_id),
+    }
+
+
+def test_write_day_merges_with_type_promotion(tmp_path):
+    """중단된 일자 재실행 - 전부 NULL이던 컬럼에 값이 들어와도 병합"""
+    archive = ArchiveRepository(str(tmp_path))
+
+    asyncio.run(archive.write_day(TCType.TC_4003, DAY, [_row(1), _row(2)]))
+    asyncio.run(archive.write_day(TCType.TC_4003, DAY, [_row(2, 'X'), _row(3, 'Y')]))
+
+    rows = asyncio.run(
+        archive.read_range(TCType.TC_4003, DAY_START, DAY_START + timedelta(days=1))
+    )
+    assert [row['id'] for row in rows] == [3, 2, 1]
+    assert [row['spare'] for row in rows] == ['Y', 'X', None]
+
+
+def test_read_range_always_includes_id(tmp_path):
+    """컬럼 선택 시에도 중복 제거용 id와 정렬용 created_at 포함"""
+    archive = ArchiveRepository(str(tmp_path))
+    asyncio.run(archive.write_day(TCType.TC_4003, DAY, [_row(1), _row(2)]))
+
+    rows = asyncio.run(
+        archive.read_range(
+            TCType.TC_4003,
+            DAY_START,
+            DAY_START + timedelta(days=1),
+            columns=['line_speed'],
+            limit=1,
+        )
+    )
+    assert rows == [{'line_speed': 20, 'created_at': DAY_START + timedelta(minutes=2), 'id': 2}]
+
+
+def test_archived_until_uses_cached_days(tmp_path):
+    """저장한 일자가 디렉터리 재조회 없이 반영"""
+    archive = ArchiveRepository(str(tmp_path))
+    assert archive.archived_until(TCType.TC_4003) is None
+
+    asyncio.run(archive.write_day(TCType.TC_4003, DAY, [_row(1)]))
+    assert archive.archived_until(TCType.TC_4003) == DAY_START + timedelta(days=1)
+    assert ArchiveRepository(str(tmp_path)).list_days(TCType.TC_4003) == [DAY]
+
+
+def test_concurrent_writes_to_same_day_are_serialized(tmp_path):
+    """두 프로세스(저장소 인스턴스)가 같은 일자를 동시에 저장해도 파일이 손상되지 않음"""
+    first = ArchiveRepository(str(tmp_path))
+    second = ArchiveRepository(str(tmp_path))
+    batches = [[_row(i) for i in range(start, start + 50)] for start in range(0, 400, 50)]
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(
+            lambda job: job[0]._write_day(TCType.TC_4003, DAY, job[1]),
+            [(first if i % 2 else second, batch) for i, batch in enumerate(batches)],
+        ))
+
+    rows = asyncio.run(
+        first.read_range(TCType.TC_4003, DAY_START, DAY_START + timedelta(days=1))
+    )
+    assert sorted(row['id'] for row in rows) == list(range(400))
+    assert not [name for name in os.listdir(first._partition_dir(TCType.TC_4003)) if name.endswith(".tmp")]
+
+
+def test_read_latest_filters_across_days(tmp_path):
+    """전체 아카이브 기간에서 조건에 맞는 최신 행 조회"""
+    archive = ArchiveRepository(str(tmp_path))
+    next_day = DAY + timedelta(days=1)
+    asyncio.run(archive.write_day(TCType.TC_4000, DAY, [
+        {'id': 1, 'coil_number': 'C1', 'created_at': DAY_START},
+        {'id': 2, 'coil_number': 'C2', 'created_at': DAY_START + timedelta(hours=1)},
+    ]))
+    asyncio.run(archive.write_day(TCType.TC_4000, next_day, [
+        {'id': 3, 'coil_number': 'C2', 'created_at': DAY_START + timedelta(days=1)},
+    ]))
+
+    latest = asyncio.run(
+        archive.read_latest(TCType.TC_4000, filters=[('coil_number', '==', 'C1')], limit=1)
+    )
+    assert [row['id'] for row in latest] == [1]
+
+    latest = asyncio.run(
+        archive.read_latest(TCType.TC_4000, filters=[('coil_number', '==', 'C2')], limit=1)
+    )
+    assert [row['id'] for row in latest] == [3]
@@ -0,0 +1,75 @@
+"""
+ListenerHandoff 테스트
+"""
+
+import asyncio
+
+from app.adapters.tcp.listener_handoff import ListenerHandoff
+
+
+BINDINGS = {'dongkook': ('127.0.0.1', 0)}
+
+
+def _close(*handoffs: ListenerHandoff) -> None:
+    for handoff in handoffs:
+        for sock in handoff.sockets.values():
+            sock.close()
+        handoff.close()
+
+
+async def _serve_old(path: str):
+    old = ListenerHandoff(path, timeout=1.0, ready_timeout=1.0)
+    await old.acquire(BINDINGS)
+    handed_off = asyncio.Event()
+
+    async def on_handoff() -> None:
+        handed_off.set()
+
+    task = asyncio.create_task(old.serve(on_handoff))
+    await asyncio.sleep(0.05)
+    return old, task, handed_off
+
+
+def test_old_process_hands_off_only_after_ready(tmp_path):
+    """새 프로세스가 READY를 보낸 뒤에만 기존 프로세스가 종료 단계로 진입"""
+    async def scenario():
+        old, task, handed_off = await _serve_old(str(tmp_path / "handoff.sock"))
+
+        new = ListenerHandoff(old.path)
+        sockets = await new.acquire(BINDINGS)
+        assert sockets['dongkook'].getsockname() == old.sockets['dongkook'].getsockname()
+
+        await asyncio.sleep(0.05)
+        assert not handed_off.is_set()
+
+        await new.confirm()
+        await asyncio.wait_for(handed_off.wait(), 1.0)
+        await task
+        _close(old, new)
+
+    asyncio.run(scenario())
+
+
+def test_new_process_failure_keeps_old_process_serving(tmp_path):
+    """READY 전에 새 프로세스가 종료되면 인계를 취소하고 다음 요청을 다시 받음"""
+    async def scenario():
+        old, task, handed_off = await _serve_old(str(tmp_path / "handoff.sock"))
+
+        failed = ListenerHandoff(old.path)
+        await failed.acquire(BINDINGS)
+        # 시작 실패 시 종료 처리 - 인계 경로는 기존 프로세스 소유이므로 그대로 유지
+        _close(failed)
+
+        await asyncio.sleep(0.05)
+        assert not handed_off.is_set()
+        assert not task.done()
+
+        retry = ListenerHandoff(old.path)
+        sockets = await retry.acquire(BINDINGS)
+        assert sockets['dongkook'].getsockname() == old.sockets['dongkook'].getsockname()
+        await retry.confirm()
+        await asyncio.wait_for(handed_off.wait(), 1.0)
+        await task
+        _close(old, retry)
+
+    asyncio.run(scenario())
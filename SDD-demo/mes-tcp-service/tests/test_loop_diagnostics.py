@@ -0,0 +1,30 @@
+"""
+LoopDiagnostics 테스트
+"""
+
+import asyncio
+
+from app.adapters.monitoring.loop_diagnostics import LoopDiagnostics
+
+
+def test_quick_off_on_leaves_single_watchdog():
+    """비활성 직후 다시 활성화해도 이전 감시 스레드는 종료"""
+    async def scenario():
+        diagnostics = LoopDiagnostics(slow_threshold=0.2)
+        diagnostics.attach(asyncio.get_running_loop())
+
+        diagnostics.enable()
+        first = diagnostics._watchdog
+        diagnostics.disable()
+        diagnostics.enable()
+        second = diagnostics._watchdog
+
+        first.join(1.0)
+        assert not first.is_alive()
+        assert second.is_alive()
+
+        diagnostics.disable()
+        second.join(1.0)
+        assert not second.is_alive()
+
+    asyncio.run(scenario())
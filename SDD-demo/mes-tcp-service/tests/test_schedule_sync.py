@@ -0,0 +1,132 @@
+"""
+ScheduleSyncUseCase 테스트
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+# use_case는 이 저장소에 포함되지 않은 서비스 모듈(app.domain, app.ports)과 asyncpg에 의존
+pytest.importorskip("asyncpg")
+pytest.importorskip("app.domain.service")
+pytest.importorskip("app.ports.output_port")
+
+from app.application.use_case import ScheduleSyncUseCase
+
+
+MAX_COIL_LENGTH = 50  # schedules.coil_id VARCHAR(50)
+
+
+class FakeRepository:
+    """schedules 반영 기록용 저장소 - coil_id가 너무 긴 행은 거부"""
+
+    def __init__(self):
+        self.schedules = {}
+        self.down = False
+        self.fail_lookup = False
+        self.fail_listen = False
+
+    async def listen(self, channel, callback):
+        if self.fail_listen:
+            raise ConnectionError("listen failed")
+
+    async def get_customer_ids(self):
+        if self.fail_lookup:
+            raise ConnectionError("lookup failed")
+        return {'ACME': 1}
+
+    async def get_bom_ids(self):
+        return {'B1': 10}
+
+    def _check_connection(self):
+        if self.down:
+            raise ConnectionError("connection lost")
+
+    async def upsert_schedules(self, rows):
+        self._check_connection()
+        if any(len(row[0]) > MAX_COIL_LENGTH for row in rows):
+            raise ValueError("value too long for type character varying(50)")
+        for row in rows:
+            self.schedules[row[0]] = row
+        return len(rows)
+
+    async def upsert_schedules_each(self, rows):
+        self._check_connection()
+        rejected = [row for row in rows if len(row[0]) > MAX_COIL_LENGTH]
+        for row in rows:
+            if row not in rejected:
+                self.schedules[row[0]] = row
+        return len(rows) - len(rejected), rejected
+
+
+def _schedule(coil_number: str) -> SimpleNamespace:
+    return SimpleNamespace(data={'coil_number': coil_number, 'customer_name': 'ACME', 'ccl_bom': 'B1'})
+
+
+def test_bad_row_does_not_block_batch_and_is_dropped_after_max_attempts():
+    """DB가 거부한 행만 재시도하고 max_attempts회 후 폐기, 나머지는 반영"""
+    async def scenario():
+        repository = FakeRepository()
+        sync = ScheduleSyncUseCase(repository, max_attempts=2)
+        await sync.initialize()
+
+        bad = "X" * (MAX_COIL_LENGTH + 1)
+        for coil_number in ("C1", bad, "C2"):
+            sync.enqueue(_schedule(coil_number))
+
+        assert await sync.flush() == 2
+        assert set(repository.schedules) == {"C1", "C2"}
+        assert list(sync.pending) == [bad]
+
+        sync.enqueue(_schedule("C3"))
+        assert await sync.flush() == 1
+        assert "C3" in repository.schedules
+        assert not sync.pending
+        assert sync.stats['rejected'] == 2
+        assert sync.stats['dropped'] == 1
+        assert not sync.attempts
+
+    asyncio.run(scenario())
+
+
+def test_connection_failure_requeues_without_counting_attempts():
+    """연결 오류는 행 거부로 보지 않고 배치 전체를 재시도"""
+    async def scenario():
+        repository = FakeRepository()
+        sync = ScheduleSyncUseCase(repository, max_attempts=1)
+        await sync.initialize()
+
+        repository.down = True
+        sync.enqueue(_schedule("C1"))
+        assert await sync.flush() == 0
+        assert await sync.flush() == 0
+        assert list(sync.pending) == ["C1"]
+        assert sync.stats['errors'] == 2
+        assert sync.stats['dropped'] == 0
+
+        repository.down = False
+        assert await sync.flush() == 1
+        assert repository.schedules["C1"] == ("C1", 1, 10)
+
+    asyncio.run(scenario())
+
+
+def test_initialize_failure_does_not_raise_and_flush_retries_cache():
+    """알림 구독/캐시 로드 실패 시 시작은 계속하고 다음 배치에서 캐시 재로드"""
+    async def scenario():
+        repository = FakeRepository()
+        repository.fail_listen = True
+        repository.fail_lookup = True
+        sync = ScheduleSyncUseCase(repository)
+
+        await sync.initialize()
+        assert sync.cache_stale
+
+        repository.fail_lookup = False
+        sync.enqueue(_schedule("C1"))
+        assert await sync.flush() == 1
+        assert not sync.cache_stale
+        assert repository.schedules["C1"] == ("C1", 1, 10)
+
+    asyncio.run(scenario())